@@ -0,0 +1,1516 @@
+# SPDX-FileCopyrightText: 2017 Scott Shawcroft, written for Adafruit Industries
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager`
+================================================================================
+
+A urllib3.poolmanager/urllib3.connectionpool-like library for managing sockets and connections
+
+
+* Author(s): Justin Myers
+
+Implementation Notes
+--------------------
+
+**Software and Dependencies:**
+
+* Adafruit CircuitPython firmware for the supported boards:
+  https://circuitpython.org/downloads
+
+Only the core `ConnectionManager` is loaded on import. The radio helpers, fake SSL context and
+extras like `MultiConnectionManager` are in modules of this package loaded on first use.
+
+"""
+
+__version__ = "0.0.0+auto.0"
+__repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_ConnectionManager.git"
+
+import errno
+import sys
+import time
+
+try:
+    from threading import Condition, Thread
+except ImportError:
+    # No threads to wait on other callers, like on CircuitPython
+    Condition = None
+    Thread = None
+
+try:
+    from os import register_at_fork
+except ImportError:
+    # Can't fork, like on CircuitPython
+    register_at_fork = None
+
+WIZNET5K_SSL_SUPPORT_VERSION = (9, 1)
+
+if not sys.implementation.name == "circuitpython":
+    from typing import List, Optional, Tuple
+
+    from circuitpython_typing.socket import (
+        CircuitPythonSocketType,
+        InterfaceType,
+        SocketpoolModuleType,
+        SocketType,
+        SSLContextType,
+    )
+
+
+class CPythonNetwork:
+    """Radio object to use when using ConnectionManager in CPython."""
+
+
+class _SocketRecord:
+    """What the ConnectionManager tracks for each managed socket."""
+
+    __slots__ = (
+        "key",
+        "generation",
+        "priority",
+        "created",
+        "last_used",
+        "checkouts",
+        "connect_time",
+        "bytes_sent",
+        "bytes_received",
+        "connect_args",
+    )
+
+    def __init__(
+        self,
+        key: Tuple,
+        generation: int,
+        priority: int = 0,
+        connect_time: Optional[float] = None,
+        connect_args: Optional[Tuple] = None,
+    ) -> None:
+        self.key = key
+        self.generation = generation
+        self.priority = priority
+        # to connect a replacement when the socket is retired
+        self.connect_args = connect_args
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.checkouts = 1
+        self.connect_time = connect_time
+        # only counted for sockets wrapped with meter_sockets
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def check_out(self) -> None:
+        """Count the socket being handed out again."""
+        self.checkouts += 1
+        self.last_used = time.monotonic()
+
+
+class _NoCondition:
+    """Stands in for a `threading.Condition` where there are no threads."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def notify_all(self) -> None:
+        """Nothing can be waiting"""
+
+
+class _Waiter:
+    """A `ConnectionManager.get_socket` call waiting for a socket to be freed."""
+
+    __slots__ = ("key", "auto_session", "priority", "order", "needs_room", "socket", "granted")
+
+    def __init__(self, key: Tuple, auto_session: bool, priority: int) -> None:
+        self.key = key
+        self.auto_session = auto_session
+        self.priority = priority
+        # set once queued, to keep the first come first in line
+        self.order = None
+        # whether any room to connect will do, or only the socket for its key
+        self.needs_room = False
+        # set when handed a freed socket or the room to connect one
+        self.socket = None
+        self.granted = False
+
+    def wants(self, key: Tuple) -> bool:
+        """Whether a freed socket with the given key can be handed to this waiter."""
+        if self.auto_session:
+            return key[:3] == self.key[:3] and key[4:] == self.key[4:] and isinstance(key[3], int)
+        return key == self.key
+
+
+def _get_timeout(timeout: Optional[float], deadline: Optional[float]) -> Optional[float]:
+    """Bound ``timeout`` by the time left before ``deadline`` (a `time.monotonic` value)."""
+    if deadline is None:
+        return timeout
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise OSError(errno.ETIMEDOUT, "Deadline exceeded")
+    if timeout is None:
+        return remaining
+    return min(timeout, remaining)
+
+
+def _reset_after_fork() -> None:
+    """Forget the sockets inherited by a forked child, which the parent is still using."""
+    for connection_manager in list(_fork_safe_connection_managers):
+        connection_manager._reset_after_fork()
+
+
+if register_at_fork is not None:
+    import weakref
+
+    _fork_safe_connection_managers = weakref.WeakSet()
+    register_at_fork(after_in_child=_reset_after_fork)
+else:
+    _fork_safe_connection_managers = None
+
+
+# The socket pool constants for each socket option: the level and the option names to try
+_SOCKET_OPTIONS = {
+    "nodelay": ("IPPROTO_TCP", ("TCP_NODELAY",)),
+    "keepalive": ("SOL_SOCKET", ("SO_KEEPALIVE",)),
+    "keepalive_idle": ("IPPROTO_TCP", ("TCP_KEEPIDLE", "TCP_KEEPALIVE")),
+    "keepalive_interval": ("IPPROTO_TCP", ("TCP_KEEPINTVL",)),
+    "keepalive_count": ("IPPROTO_TCP", ("TCP_KEEPCNT",)),
+    "rcvbuf": ("SOL_SOCKET", ("SO_RCVBUF",)),
+    "sndbuf": ("SOL_SOCKET", ("SO_SNDBUF",)),
+}
+
+
+def _resolve_socket_options(socket_pool: SocketpoolModuleType, socket_options: dict) -> list:
+    """Get the ``(level, option, value)`` for each socket option the pool has constants for."""
+    resolved = []
+    for name, value in socket_options.items():
+        if name not in _SOCKET_OPTIONS:
+            raise ValueError(f"Unsupported socket option: {name}")
+        level_name, option_names = _SOCKET_OPTIONS[name]
+        level = getattr(socket_pool, level_name, None)
+        for option_name in option_names:
+            option = getattr(socket_pool, option_name, None)
+            if level is not None and option is not None:
+                resolved.append((level, option, int(value)))
+                break
+    return resolved
+
+
+def _get_literal_family(socket_pool: SocketpoolModuleType, host: str) -> Optional[int]:
+    """Get the address family for a numeric IP address, ``None`` for a name to look up."""
+    if ":" in host:
+        return getattr(socket_pool, "AF_INET6", None)
+    parts = host.split(".")
+    if len(parts) == 4 and all(part.isdigit() and int(part) < 256 for part in parts):
+        return getattr(socket_pool, "AF_INET", None)
+    return None
+
+
+# The radio attributes that change with its network, in the order to look for them
+_RADIO_CONNECTED_NAMES = ("connected", "is_connected", "link_status")
+_RADIO_ADDRESS_NAMES = ("ipv4_address", "ip_address")
+
+
+def _get_radio_state_names(radio) -> Tuple:
+    """Get the first connection state attribute and the first IP attribute the radio has."""
+    names = []
+    for candidates in (_RADIO_CONNECTED_NAMES, _RADIO_ADDRESS_NAMES):
+        for name in candidates:
+            # checked without reading them, since that can be a round trip to a co-processor
+            if hasattr(type(radio), name) or name in getattr(radio, "__dict__", ()):
+                names.append(name)
+                break
+    return tuple(names)
+
+
+def _get_radio_state(radio, names: Tuple) -> Tuple:
+    """Get the radio attributes that change with its network: connection state and IP."""
+    state = []
+    for name in names:
+        try:
+            state.append(getattr(radio, name, None))
+        except (OSError, RuntimeError):
+            state.append(None)
+    return tuple(state)
+
+
+_global_connection_managers = {}
+_global_key_by_socketpool = {}
+_global_socketpools = {}
+_global_ssl_contexts = {}
+# Set by use_weak_registries
+_global_weakref = None
+# Weakly registered connection managers with sockets in use, kept alive until they're given back
+_global_busy_connection_managers = set()
+_global_max_socketpools = None
+_global_socketpool_keys = []
+
+
+def use_weak_registries(max_socketpools: int = 4) -> bool:
+    """
+    Stop the helpers from keeping radios, socket pools, SSL contexts and connection managers
+    alive after the code using them is done with them.
+
+    Where ``weakref`` is available, they are forgotten once nothing else references them and a
+    connection manager's idle sockets are closed when it is garbage collected. A connection
+    manager from `get_connection_manager` is kept while any of its sockets are in use, so
+    ``get_connection_manager(pool).get_socket(...)`` still works. Otherwise, only the
+    ``max_socketpools`` most recently used socket pools are kept and older ones are released as
+    with ``connection_manager_close_all(pool, release_references=True)``.
+
+    :param int max_socketpools: how many socket pools to keep when ``weakref`` isn't available
+    :return: ``True`` if weak references are used
+    """
+    global _global_connection_managers  # noqa: PLW0603
+    global _global_key_by_socketpool  # noqa: PLW0603
+    global _global_socketpools  # noqa: PLW0603
+    global _global_weakref  # noqa: PLW0603
+    global _global_max_socketpools  # noqa: PLW0603
+
+    try:
+        import weakref
+    except ImportError:
+        _global_max_socketpools = max_socketpools
+        for key in _global_socketpools:
+            if key not in _global_socketpool_keys:
+                _global_socketpool_keys.append(key)
+        return False
+
+    if _global_weakref is None:
+        _global_weakref = weakref
+        _global_connection_managers = weakref.WeakValueDictionary(_global_connection_managers)
+        _global_key_by_socketpool = weakref.WeakKeyDictionary(_global_key_by_socketpool)
+        _global_socketpools = weakref.WeakValueDictionary(_global_socketpools)
+    return True
+
+
+def _close_sockets(managed_socket_by_key: dict) -> None:
+    for socket in list(managed_socket_by_key.values()):
+        try:
+            socket.close()
+        except OSError:
+            pass
+    managed_socket_by_key.clear()
+
+
+def _get_radio_hash_key(radio):
+    try:
+        return hash(radio)
+    except TypeError:
+        return radio.__class__.__name__
+
+
+def create_fake_ssl_context(
+    socket_pool: SocketpoolModuleType, iface: InterfaceType
+) -> "_FakeSSLContext":
+    """Method to return a fake SSL context for when ssl isn't available to import
+
+    For example when using a:
+
+     * `Adafruit Ethernet FeatherWing <https://www.adafruit.com/product/3201>`_
+     * `Adafruit AirLift – ESP32 WiFi Co-Processor Breakout Board
+       <https://www.adafruit.com/product/4201>`_
+     * `Adafruit AirLift FeatherWing – ESP32 WiFi Co-Processor
+       <https://www.adafruit.com/product/4264>`_
+    """
+    from adafruit_connection_manager.fake_ssl import create_fake_ssl_context as create
+
+    return create(socket_pool, iface)
+
+
+def get_radio_socketpool(radio):
+    """Helper to get a socket pool for common boards.
+
+    Currently supported:
+
+     * Boards with onboard WiFi (ESP32S2, ESP32S3, Pico W, etc)
+     * Using the ESP32 WiFi Co-Processor (like the Adafruit AirLift)
+     * Using a WIZ5500 (Like the Adafruit Ethernet FeatherWing)
+    """
+    from adafruit_connection_manager.radio import get_radio_socketpool as get
+
+    return get(radio)
+
+
+def get_radio_ssl_context(radio):
+    """Helper to get ssl_contexts for common boards.
+
+    Currently supported:
+
+     * Boards with onboard WiFi (ESP32S2, ESP32S3, Pico W, etc)
+     * Using the ESP32 WiFi Co-Processor (like the Adafruit AirLift)
+     * Using a WIZ5500 (Like the Adafruit Ethernet FeatherWing)
+    """
+    from adafruit_connection_manager.radio import get_radio_ssl_context as get
+
+    return get(radio)
+
+
+class ConnectionManager:
+    """A library for managing sockets across multiple hardware platforms and libraries."""
+
+    def __init__(
+        self,
+        socket_pool: SocketpoolModuleType,
+        *,
+        max_sockets: Optional[int] = None,
+        max_sockets_per_origin: int = 2,
+        min_adaptive_timeout: float = 0.2,
+        meter_sockets: bool = False,
+        socket_options: Optional[dict] = None,
+        idle_timeout: Optional[float] = None,
+        hosts: Optional[dict] = None,
+    ) -> None:
+        """
+        :param SocketpoolModuleType socket_pool: the socket pool to get sockets from
+        :param Optional[int] max_sockets: the most sockets to manage at once, ``None`` for no
+          limit beyond what the radio allows; idle sockets are closed to make room when needed
+        :param int max_sockets_per_origin: the most sockets to the same host, port and protocol
+          when session IDs are picked automatically with ``auto_session``
+        :param float min_adaptive_timeout: the shortest connect timeout ``adaptive_timeout``
+          will use
+        :param bool meter_sockets: ``True`` to hand out sockets wrapped to count the bytes sent
+          and received for `connections`
+        :param Optional[dict] socket_options: options to set on each socket before connecting:
+          ``nodelay``, ``keepalive``, ``keepalive_idle``, ``keepalive_interval``,
+          ``keepalive_count``, ``rcvbuf`` and ``sndbuf``, like ``{"nodelay": True}``; options
+          the socket pool has no constants for, or its sockets can't set, are skipped
+        :param Optional[float] idle_timeout: how many seconds a socket can be idle before
+          `maintain` closes it, ``None`` to keep idle sockets until the room is needed
+        :param Optional[dict] hosts: host names to connect to without looking them up, see
+          `add_hosts`
+        """
+        self._socket_pool = socket_pool
+        self._max_sockets = max_sockets
+        self._max_sockets_per_origin = max_sockets_per_origin
+        self._min_adaptive_timeout = min_adaptive_timeout
+        self._meter_sockets = meter_sockets
+        self._socket_option_values = socket_options or {}
+        self._socket_options = _resolve_socket_options(socket_pool, self._socket_option_values)
+        self._connect_time_by_origin = {}
+        # Hang onto open sockets so that we can reuse them.
+        self._available_sockets = set()
+        self._record_by_managed_socket = {}
+        self._managed_socket_by_key = {}
+        # Bumped when the network changes, making all the sockets opened before then stale.
+        self._generation = 0
+        self._radio = None
+        self._radio_state = None
+        self._radio_state_names = ()
+        self._radio_check_interval = 0.0
+        self._radio_checked_at = None
+        # Callers waiting for a socket, most important and then oldest first
+        self._condition = _NoCondition() if Condition is None else Condition()
+        self._waiters = []
+        self._waiter_order = 0
+        # Room taken by connects in progress and granted to waiters
+        self._reserved_socket_count = 0
+        self._connecting_keys = set()
+        self._origin_settings = {}
+        self._connect_args_by_origin = {}
+        self._idle_timeout = idle_timeout
+        self._reaper = None
+        # Set by drain, to stop handing out sockets
+        self._draining = False
+        # Set by get_connection_manager for weak registries
+        self._kept_while_busy = False
+        self._hosts = {}
+        if hosts:
+            self.add_hosts(hosts)
+        if _fork_safe_connection_managers is not None:
+            _fork_safe_connection_managers.add(self)
+        self._wait_count = 0
+        self._wait_timeout_count = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._hedging = None
+
+    def _reset_after_fork(self) -> None:
+        """Forget the parent's sockets without closing them, and the parent's waiters."""
+        self._available_sockets.clear()
+        self._record_by_managed_socket.clear()
+        self._managed_socket_by_key.clear()
+        # the lock could have been held by one of the parent's other threads
+        self._condition = _NoCondition() if Condition is None else Condition()
+        self._waiters = []
+        self._reserved_socket_count = 0
+        self._connecting_keys = set()
+        # the parent's reaper thread isn't running here
+        self._reaper = None
+        self._draining = False
+        self._update_busy()
+
+    def _check_radio(self) -> None:
+        """Check if the watched radio changed networks since it was last checked."""
+        now = time.monotonic()
+        if now - self._radio_checked_at < self._radio_check_interval:
+            return
+        self._radio_checked_at = now
+        radio_state = _get_radio_state(self._radio, self._radio_state_names)
+        if radio_state != self._radio_state:
+            self._radio_state = radio_state
+            self.network_changed()
+
+    def _get_evictable_sockets(self, priority: Optional[int] = None) -> list:
+        """Get the available sockets no more important than ``priority`` (``None`` for all)."""
+        return [
+            socket
+            for socket in self._available_sockets
+            if priority is None or self._record_by_managed_socket[socket].priority <= priority
+        ]
+
+    def _free_sockets(self, force: bool = False, priority: Optional[int] = None) -> None:
+        # cloning lists since items are being removed
+        available_sockets = self._get_evictable_sockets(priority)
+        for socket in available_sockets:
+            self.close_socket(socket)
+        if force:
+            open_sockets = list(self._managed_socket_by_key.values())
+            for socket in open_sockets:
+                self.close_socket(socket)
+
+    def _get_auto_session_id(
+        self, host: str, port: int, proto: str, reserved_keys=(), key_suffix: Tuple = ()
+    ) -> int:
+        """Get the slot of an idle socket for the origin, or else the first unused slot."""
+        unused_slot = None
+        for slot in range(self._max_sockets_per_origin):
+            key = (host, port, proto, slot) + key_suffix
+            socket = self._managed_socket_by_key.get(key)
+            if socket in self._available_sockets:
+                return slot
+            if (
+                socket is None
+                and unused_slot is None
+                and key not in reserved_keys
+                and key not in self._connecting_keys
+            ):
+                unused_slot = slot
+        if unused_slot is None:
+            raise RuntimeError(
+                f"All {self._max_sockets_per_origin} sockets are already connected to "
+                f"{proto}//{host}:{port}"
+            )
+        return unused_slot
+
+    def _update_connect_time(self, host: str, port: int, elapsed: float) -> None:
+        """Update the smoothed connect time and its variation (like TCP's SRTT and RTTVAR)."""
+        connect_time = self._connect_time_by_origin.get((host, port))
+        if connect_time is None:
+            self._connect_time_by_origin[(host, port)] = [elapsed, elapsed / 2]
+        else:
+            connect_time[1] = 0.75 * connect_time[1] + 0.25 * abs(connect_time[0] - elapsed)
+            connect_time[0] = 0.875 * connect_time[0] + 0.125 * elapsed
+        if self._hedging is not None:
+            self._hedging.add_connect_time(host, port, elapsed)
+
+    def _get_adaptive_timeout(self, host: str, port: int, timeout: Optional[float]):
+        """Get a connect timeout from the connect times seen, no longer than ``timeout``."""
+        connect_time = self._connect_time_by_origin.get((host, port))
+        if connect_time is None:
+            return timeout
+        adaptive_timeout = max(connect_time[0] + 4 * connect_time[1], self._min_adaptive_timeout)
+        if timeout is None:
+            return adaptive_timeout
+        return min(adaptive_timeout, timeout)
+
+    def _has_room(self) -> bool:
+        """Whether another socket can be connected without going over ``max_sockets``."""
+        if self._max_sockets is None:
+            return True
+        return self.managed_socket_count + self._reserved_socket_count < self._max_sockets
+
+    def _grant_room(self, key: Optional[Tuple] = None) -> None:
+        """Give the room to connect a socket to the first waiter that can use it."""
+        for waiter in self._waiters:
+            if waiter.needs_room or (key is not None and waiter.wants(key)):
+                self._waiters.remove(waiter)
+                waiter.granted = True
+                self._reserved_socket_count += 1
+                self._condition.notify_all()
+                return
+
+    def _release_room(self, key: Optional[Tuple] = None) -> None:
+        """Give back room reserved with ``_reserved_socket_count`` that wasn't used."""
+        self._reserved_socket_count -= 1
+        self._connecting_keys.discard(key)
+        self._grant_room(key)
+
+    def _wait_for_socket(self, waiter: _Waiter, wait_until: float) -> None:
+        """Queue the waiter and wait until it's handed a socket or room to connect one."""
+        if waiter.order is None:
+            self._waiter_order += 1
+            waiter.order = self._waiter_order
+        index = 0
+        while index < len(self._waiters) and (
+            self._waiters[index].priority,
+            -self._waiters[index].order,
+        ) >= (waiter.priority, -waiter.order):
+            index += 1
+        self._waiters.insert(index, waiter)
+
+        start = time.monotonic()
+        try:
+            while waiter.socket is None and not waiter.granted:
+                remaining = wait_until - time.monotonic()
+                if remaining <= 0:
+                    self._wait_timeout_count += 1
+                    raise OSError(errno.ETIMEDOUT, "Timed out waiting for a socket")
+                self._condition.wait(remaining)
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            wait_time = time.monotonic() - start
+            self._wait_count += 1
+            self._total_wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    def _is_worn_out(self, record: _SocketRecord) -> bool:
+        """Whether a socket reached the ``max_uses`` or ``max_age`` set for its origin."""
+        settings = self._origin_settings.get(record.key[:2])
+        if settings is None:
+            return False
+        max_uses = settings["max_uses"]
+        if max_uses is not None and record.checkouts >= max_uses:
+            return True
+        max_age = settings["max_age"]
+        return max_age is not None and time.monotonic() - record.created >= max_age
+
+    def _preopen_socket(self, record: _SocketRecord) -> None:
+        """Connect a replacement for a retired socket in the background, if there's room."""
+        key = record.key
+        if (
+            Thread is None
+            or record.connect_args is None
+            or self._draining
+            or self._waiters
+            or key in self._managed_socket_by_key
+            or key in self._connecting_keys
+            or not self._has_room()
+        ):
+            # waiting callers will connect their own
+            return
+        self._reserved_socket_count += 1
+        self._connecting_keys.add(key)
+        # the replacement is for later requests, so it doesn't get their deadline
+        connect_args = record.connect_args[:6] + (None,) + record.connect_args[7:]
+        from adafruit_connection_manager.maintain import open_idle_socket
+
+        Thread(
+            target=open_idle_socket, args=(self, key, connect_args, record.priority), daemon=True
+        ).start()
+
+    def _register_connected_socket(
+        self,
+        key,
+        socket,
+        priority: int = 0,
+        connect_time: Optional[float] = None,
+        connect_args: Optional[Tuple] = None,
+    ):
+        """Register a socket as managed, returning the socket to hand out."""
+        record = _SocketRecord(key, self._generation, priority, connect_time, connect_args)
+        settings = self._origin_settings.get(key[:2])
+        if connect_args is not None and settings is not None and settings["min_idle"]:
+            # remembered to keep min_idle sockets connected to the origin
+            self._connect_args_by_origin[key[:2]] = (
+                key[2],
+                key[4:],
+                connect_args[:6] + (None,) + connect_args[7:],
+            )
+        if self._meter_sockets:
+            from adafruit_connection_manager.metered import _MeteredSocket
+
+            socket = _MeteredSocket(socket, record)
+        self._record_by_managed_socket[socket] = record
+        self._managed_socket_by_key[key] = socket
+        self._update_busy()
+        return socket
+
+    def _update_busy(self) -> None:
+        """Keep a weakly registered manager alive while any of its sockets are in use."""
+        if not self._kept_while_busy:
+            return
+        if len(self._available_sockets) < len(self._record_by_managed_socket):
+            _global_busy_connection_managers.add(self)
+        else:
+            _global_busy_connection_managers.discard(self)
+
+    def _set_socket_options(self, socket: SocketType, host: str, port: int) -> None:
+        """Set the socket options for the origin, skipping any the socket can't set."""
+        settings = self._origin_settings.get((host, port))
+        if settings is None or settings["socket_options"] is None:
+            socket_options = self._socket_options
+        else:
+            socket_options = settings["socket_options"]
+        if not socket_options or not hasattr(socket, "setsockopt"):
+            return
+        for level, option, value in socket_options:
+            try:
+                socket.setsockopt(level, option, value)
+            except (OSError, NotImplementedError):
+                pass
+
+    def _get_connected_socket(
+        self,
+        addr_info: List[Tuple[int, int, int, str, Tuple[str, int]]],
+        host: str,
+        port: int,
+        timeout: Optional[float],
+        is_ssl: bool,
+        ssl_context: Optional[SSLContextType] = None,
+        read_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        proxy: Optional[Tuple[str, int]] = None,
+        proxy_headers: Optional[dict] = None,
+    ):
+        # Check the deadline before allocating anything.
+        connect_timeout = _get_timeout(timeout, deadline)
+
+        socket = self._socket_pool.socket(addr_info[0], addr_info[1])
+        self._set_socket_options(socket, host, port)
+
+        if is_ssl and proxy is None:
+            socket = ssl_context.wrap_socket(socket, server_hostname=host)
+        if isinstance(addr_info[-1], str):
+            # a unix socket's path
+            address = addr_info[-1]
+        elif proxy is not None:
+            address = (addr_info[-1][0], proxy[1])
+        elif is_ssl and (
+            host.lower() not in self._hosts or getattr(socket, "_connects_by_name", False)
+        ):
+            # co-processors doing TLS themselves need the name, even for pinned hosts
+            address = (host, port)
+        else:
+            address = (addr_info[-1][0], port)
+
+        # Set socket connect timeout, for SSL this also covers the handshake.
+        socket.settimeout(connect_timeout)
+
+        start = time.monotonic()
+        try:
+            socket.connect(address)
+            if proxy is not None:
+                # have the proxy open a tunnel to the host, then use SSL through it if needed
+                from adafruit_connection_manager.proxy import open_tunnel
+
+                open_tunnel(socket, host, port, proxy_headers)
+                if is_ssl:
+                    socket = ssl_context.wrap_socket(socket, server_hostname=host)
+        except (MemoryError, OSError):
+            # If any connect problems, clean up and re-raise the problem exception.
+            socket.close()
+            elapsed = time.monotonic() - start
+            if connect_timeout is not None and elapsed >= connect_timeout:
+                # timing out counts as a slow sample, so adaptive timeouts back off
+                self._update_connect_time(host, port, elapsed)
+            raise
+        connect_time = time.monotonic() - start
+        self._update_connect_time(host, port, connect_time)
+
+        # Set socket read timeout.
+        if read_timeout != connect_timeout:
+            socket.settimeout(read_timeout)
+
+        return socket, connect_time
+
+    @property
+    def available_socket_count(self) -> int:
+        """Get the count of available (freed) managed sockets."""
+        return len(self._available_sockets)
+
+    @property
+    def managed_socket_count(self) -> int:
+        """Get the count of managed sockets."""
+        return len(self._managed_socket_by_key)
+
+    @property
+    def waiting_count(self) -> int:
+        """Get the count of `get_socket` calls waiting for a socket."""
+        return len(self._waiters)
+
+    def connections(self) -> List[dict]:
+        """
+        Get a snapshot of the managed sockets. For each, a dict with the socket's ``key``
+        (``host``, ``port``, ``proto`` and ``session_id``), its ``state`` (``"in use"``,
+        ``"available"`` or ``"stale"`` if opened before the network changed) and ``priority``,
+        when it was ``created`` and ``last_used`` (`time.monotonic` values), how many
+        ``checkouts`` it has had, its ``connect_time`` in seconds (including the TLS handshake
+        for SSL sockets), and the ``bytes_sent`` and ``bytes_received`` when ``meter_sockets``
+        is set.
+        """
+        from adafruit_connection_manager.stats import get_connections
+
+        return get_connections(self)
+
+    @property
+    def wait_stats(self) -> dict:
+        """
+        Get how callers have waited for sockets: ``waiting`` now, how many ``waits`` there were
+        and how many of those ended in ``timeouts``, and the ``total_wait_time`` and
+        ``max_wait_time`` in seconds.
+        """
+        from adafruit_connection_manager.stats import get_wait_stats
+
+        return get_wait_stats(self)
+
+    @property
+    def hedge_stats(self) -> dict:
+        """
+        Get how hedging has gone: the ``connects`` made while hedging was on, the ``hedges``
+        started for them and the hedges that ``won`` by connecting first.
+        """
+        from adafruit_connection_manager.stats import get_hedge_stats
+
+        return get_hedge_stats(self)
+
+    def close_socket(self, socket: SocketType) -> None:
+        """
+        Close a previously managed and connected socket.
+
+        - **socket_pool** *(SocketType)* – The socket you want to close
+        """
+        with self._condition:
+            if socket not in self._record_by_managed_socket:
+                raise RuntimeError("Socket not managed")
+            socket.close()
+            key = self._forget_socket(socket)
+            self._grant_room(key)
+
+    def _forget_socket(self, socket: SocketType) -> Tuple:
+        """Stop managing a socket, returning its key."""
+        key = self._record_by_managed_socket.pop(socket).key
+        del self._managed_socket_by_key[key]
+        self._available_sockets.discard(socket)
+        self._update_busy()
+        if self._draining:
+            # drain is waiting for the sockets in use to be given back
+            self._condition.notify_all()
+        return key
+
+    def _close_all_sockets(self) -> None:
+        """Close all the managed sockets, at the same time for CPython sockets."""
+        is_cpython_pool = getattr(self._socket_pool, "__name__", None) == "socket"
+        if Thread is None or not is_cpython_pool:
+            self._free_sockets(force=True)
+            return
+
+        from adafruit_connection_manager.drain import close_all_sockets
+
+        close_all_sockets(self)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop handing out sockets and wait for the ones in use to be given back, for a clean
+        shutdown or reconfiguration. Idle sockets are closed right away, and the ones in use are
+        closed as they're given back with `free_socket`. `get_socket` calls raise
+        ``RuntimeError`` while draining, including the ones waiting for a socket, until `resume`
+        ends the drain (or `connection_manager_close_all` closes the rest and ends it).
+
+        Without ``threading`` (like on CircuitPython) nothing else can give sockets back, so
+        this doesn't wait.
+
+        :param Optional[float] timeout: how long to wait, ``None`` waits until they're all back
+        :return: ``True`` if no sockets are in use or connecting anymore
+        """
+        from adafruit_connection_manager.drain import drain
+
+        return drain(self, timeout)
+
+    def resume(self) -> None:
+        """
+        End a `drain`, so `get_socket` hands out sockets again. Sockets still in use from before
+        are closed when they're given back with `free_socket`, instead of being reused.
+        """
+        with self._condition:
+            if self._draining:
+                self._draining = False
+                self._generation += 1
+
+    def network_changed(self) -> None:
+        """
+        Mark all the current sockets as stale, for when the network was lost or changed.
+
+        Stale sockets are closed instead of being reused, as they are found by `get_socket` or
+        given back with `free_socket`.
+        """
+        self._generation += 1
+
+    def watch_radio(self, radio, interval: float = 1.0) -> None:
+        """
+        Watch the radio's connection state and IP address, calling `network_changed` when
+        either changes. They are checked when `get_socket` is called, at most once every
+        ``interval`` seconds since reading them can be a round trip to a co-processor (like on
+        the ESP32SPI and WIZNET5K).
+
+        :param radio: the radio the socket pool uses, like ``wifi.radio``
+        :param float interval: the shortest time between checks, ``0`` to check on every
+          `get_socket` call
+        """
+        self._radio = radio
+        self._radio_state_names = _get_radio_state_names(radio)
+        self._radio_check_interval = interval
+        self._radio_checked_at = time.monotonic()
+        self._radio_state = _get_radio_state(radio, self._radio_state_names)
+
+    def add_hosts(self, hosts: dict) -> None:
+        """
+        Pin host names to addresses, so connecting to them skips looking them up. The first
+        address for a host is used. SSL connections still use the host name to check the
+        server's certificate.
+
+        :param dict hosts: the addresses for each host name, as a string or a non-empty list of
+          strings, like ``{"api.example.com": "10.0.0.5"}``
+        """
+        from adafruit_connection_manager.hosts import add_hosts
+
+        add_hosts(self, hosts)
+
+    def load_hosts(self, path: str) -> None:
+        """
+        Pin host names to addresses from a hosts file, see `add_hosts`. Each line has an
+        address and then the names for it, like ``10.0.0.5 api.example.com``, and anything
+        after a ``#`` is ignored.
+
+        :param str path: the path of the hosts file, like ``"/hosts"``
+        """
+        from adafruit_connection_manager.hosts import load_hosts
+
+        load_hosts(self, path)
+
+    def configure_origin(
+        self,
+        host: str,
+        port: int,
+        *,
+        max_uses: Optional[int] = None,
+        max_age: Optional[float] = None,
+        preopen: bool = False,
+        socket_options: Optional[dict] = None,
+        idle_timeout: Optional[float] = None,
+        min_idle: int = 0,
+    ) -> None:
+        """
+        Set limits for reusing sockets to a host and port, for servers that close keep-alive
+        connections after a number of requests or a period of time. Sockets that reach either
+        limit are closed instead of being reused. Socket options for the origin can be set too.
+
+        :param str host: the host the limits are for
+        :param int port: the port the limits are for
+        :param Optional[int] max_uses: how many times a socket can be handed out by
+          `get_socket`, ``None`` for no limit
+        :param Optional[float] max_age: how many seconds after connecting a socket can be reused,
+          ``None`` for no limit
+        :param bool preopen: ``True`` to connect a replacement in the background when a socket
+          is closed for reaching ``max_uses`` or ``max_age`` as it's freed; needs ``threading``
+        :param Optional[dict] socket_options: socket options for this origin, added to and
+          overriding the ones the `ConnectionManager` was created with
+        :param Optional[float] idle_timeout: how many seconds a socket to this origin can be
+          idle before `maintain` closes it, ``None`` to use the `ConnectionManager`'s
+        :param int min_idle: how many idle sockets `maintain` keeps connected to this origin for
+          `get_socket` calls using ``auto_session``, once one has connected to it (so it knows
+          the protocol and SSL context to use)
+        """
+        if socket_options is not None:
+            socket_options = _resolve_socket_options(
+                self._socket_pool, {**self._socket_option_values, **socket_options}
+            )
+        with self._condition:
+            self._origin_settings[(host, port)] = {
+                "max_uses": max_uses,
+                "max_age": max_age,
+                "preopen": preopen,
+                "socket_options": socket_options,
+                "idle_timeout": idle_timeout,
+                "min_idle": min_idle,
+            }
+            if not min_idle:
+                # nothing to keep connected, so don't hold onto its SSL context and headers
+                self._connect_args_by_origin.pop((host, port), None)
+
+    def maintain(self) -> dict:
+        """
+        Close idle sockets that have been idle longer than their ``idle_timeout``, are too old
+        or used too much for their origin, or were opened before the network changed. Then
+        connect idle sockets to origins with fewer than their ``min_idle``, as long as no
+        `get_socket` calls are waiting.
+
+        Call this regularly from the main loop, or use `start_reaper` to call it from a
+        background thread.
+
+        :return: how many sockets were ``closed`` and ``opened``, like
+          ``{"closed": 1, "opened": 0}``
+        """
+        from adafruit_connection_manager.maintain import maintain
+
+        return maintain(self)
+
+    def start_reaper(self, interval: float = 5.0) -> None:
+        """
+        Call `maintain` every ``interval`` seconds from a background thread, until
+        `stop_reaper` is called. Needs ``threading``, so on CircuitPython call `maintain` from
+        the main loop instead.
+
+        :param float interval: how many seconds between calls to `maintain`
+        """
+        if Thread is None:
+            raise RuntimeError("A reaper thread needs threading, call maintain() instead")
+        if self._reaper is not None:
+            return
+        from adafruit_connection_manager.maintain import start_reaper
+
+        start_reaper(self, interval)
+
+    def stop_reaper(self) -> None:
+        """Stop the background thread started with `start_reaper`."""
+        if self._reaper is not None:
+            self._reaper.set()
+            self._reaper = None
+
+    def configure_hedging(
+        self,
+        percentile: Optional[float] = 0.9,
+        *,
+        budget: float = 0.1,
+        min_delay: float = 0.05,
+        min_samples: int = 5,
+    ) -> None:
+        """
+        Hedge slow connects: when connecting a new socket takes longer than usual for its host
+        and port, start a second attempt and use whichever connects first, closing the other.
+        This cuts the wait when a SYN or TLS ClientHello is lost, without waiting for the whole
+        connect timeout. Needs ``threading`` and a socket pool whose sockets can connect at the
+        same time from different threads, like CPython's.
+
+        :param Optional[float] percentile: the share of recent connect times to the origin to
+          wait for before hedging, like ``0.9`` for the 90th percentile; ``None`` turns hedging
+          off
+        :param float budget: how many hedges each connect earns, like ``0.1`` to add at most one
+          extra connect for every ten; a hedge also needs room under ``max_sockets``
+        :param float min_delay: the shortest time to wait before hedging
+        :param int min_samples: how many connects to the origin to see before hedging them
+        """
+        if percentile is None:
+            if self._hedging is not None:
+                self._hedging.percentile = None
+            return
+        if Thread is None:
+            raise RuntimeError("Hedging needs threading")
+        from adafruit_connection_manager.hedge import configure_hedging
+
+        configure_hedging(self, percentile, budget, min_delay, min_samples)
+
+    def free_socket(self, socket: SocketType) -> None:
+        """
+        Mark a managed socket as available so it can be reused. The socket is not closed.
+
+        If `get_socket` calls are waiting, the socket is handed to the first one waiting for a
+        socket to the same host. Otherwise, it's closed to make room for the first one waiting
+        to connect elsewhere, as long as that one is at least as important.
+        """
+        with self._condition:
+            if socket not in self._record_by_managed_socket:
+                raise RuntimeError("Socket not managed")
+            record = self._record_by_managed_socket[socket]
+            if record.generation != self._generation or self._draining:
+                # opened before the network changed or no longer needed, so close it
+                self.close_socket(socket)
+                return
+            if self._is_worn_out(record):
+                # close it before the server does, and maybe connect its replacement now
+                self.close_socket(socket)
+                if self._origin_settings[record.key[:2]]["preopen"]:
+                    self._preopen_socket(record)
+                return
+            for waiter in self._waiters:
+                if waiter.wants(record.key):
+                    self._waiters.remove(waiter)
+                    record.priority = waiter.priority
+                    record.check_out()
+                    waiter.socket = socket
+                    self._condition.notify_all()
+                    return
+            for waiter in self._waiters:
+                if waiter.needs_room and waiter.priority >= record.priority:
+                    self.close_socket(socket)
+                    return
+            record.last_used = time.monotonic()
+            self._available_sockets.add(socket)
+            self._update_busy()
+
+    def _prepare_socket(
+        self,
+        host: str,
+        port: int,
+        proto: str,
+        session_id: Optional[str] = None,
+        *,
+        timeout: float = 1.0,
+        is_ssl: bool = False,
+        ssl_context: Optional[SSLContextType] = None,
+        connect_timeout: Optional[float] = None,
+        tls_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        auto_session: bool = False,
+        adaptive_timeout: bool = False,
+        priority: int = 0,
+        proxy: Optional[Tuple[str, int]] = None,
+        proxy_headers: Optional[dict] = None,
+        reserved_keys=(),
+    ):
+        """Return the key and either a free socket to reuse or the args to connect a new one."""
+        if self._draining:
+            raise RuntimeError("Connection manager is draining")
+        if self._radio is not None:
+            self._check_radio()
+
+        key_suffix = ()
+        if proxy is not None:
+            if proto in {"udp:", "unix:"}:
+                raise ValueError(f"Proxies can't be used for {proto} sockets")
+            # tunnels through different proxies aren't interchangeable
+            key_suffix = (tuple(proxy),)
+
+        if auto_session:
+            # slots are ints so they never clash with the str session IDs callers pass in
+            session_id = self._get_auto_session_id(host, port, proto, reserved_keys, key_suffix)
+        elif session_id:
+            session_id = str(session_id)
+        key = (host, port, proto, session_id) + key_suffix
+
+        # Do we have already have a socket available for the requested connection?
+        if key in self._connecting_keys:
+            raise RuntimeError(f"An existing socket is already connected to {proto}//{host}:{port}")
+        if key in self._managed_socket_by_key:
+            socket = self._managed_socket_by_key[key]
+            if socket not in self._available_sockets:
+                raise RuntimeError(
+                    f"An existing socket is already connected to {proto}//{host}:{port}"
+                )
+            record = self._record_by_managed_socket[socket]
+            if record.generation == self._generation and not self._is_worn_out(record):
+                self._available_sockets.remove(socket)
+                self._update_busy()
+                record.priority = priority
+                record.check_out()
+                return key, socket, None
+            # opened before the network changed or too old, so replace it
+            self.close_socket(socket)
+
+        if proto == "https:":
+            is_ssl = True
+        if is_ssl and not ssl_context:
+            raise ValueError("ssl_context must be provided if using ssl")
+        if is_ssl and proxy is not None and getattr(ssl_context, "_connects_by_name", False):
+            # the co-processor does TLS to whatever it connects to, which would be the proxy
+            raise ValueError("The fake SSL context can't be used through a proxy")
+
+        if connect_timeout is None:
+            connect_timeout = timeout
+        if is_ssl and tls_timeout is not None and connect_timeout is not None:
+            connect_timeout += tls_timeout
+        if adaptive_timeout:
+            connect_timeout = self._get_adaptive_timeout(host, port, connect_timeout)
+        if read_timeout is None:
+            read_timeout = timeout
+
+        connect_args = (
+            host,
+            port,
+            connect_timeout,
+            is_ssl,
+            ssl_context,
+            read_timeout,
+            deadline,
+            proxy,
+            proxy_headers,
+        )
+        return key, None, connect_args
+
+    def _resolve(self, host: str, port: int, proto: str) -> Tuple:
+        """Look up the address info to connect to the host with, for streams or datagrams."""
+        if proto == "unix:":
+            family = getattr(self._socket_pool, "AF_UNIX", None)
+            if family is None:
+                raise ValueError("This socket pool does not support unix sockets")
+            # the host is the socket's path
+            return (family, self._socket_pool.SOCK_STREAM, 0, "", host)
+
+        if proto == "udp:":
+            socket_type = self._socket_pool.SOCK_DGRAM
+        else:
+            socket_type = self._socket_pool.SOCK_STREAM
+        if self._hosts:
+            # pinned hosts use their first address; SSL still uses the name
+            host = self._hosts.get(host.lower(), (host,))[0]
+        family = _get_literal_family(self._socket_pool, host)
+        if family is not None:
+            # a numeric IP address, so there's nothing to look up
+            return (family, socket_type, 0, "", (host, port))
+
+        addr_info = self._socket_pool.getaddrinfo(host, port, 0, socket_type)[0]
+        if proto == "udp:":
+            # not every socket pool fills in the socket type asked for
+            return (addr_info[0], socket_type) + tuple(addr_info[2:])
+        return addr_info
+
+    def _resolve_key(self, key: Tuple) -> Tuple:
+        """Look up the address info to connect a socket with the given key to."""
+        if len(key) > 4:
+            # connect to the proxy, which connects on to the host
+            return self._resolve(key[4][0], key[4][1], "http:")
+        return self._resolve(key[0], key[1], key[2])
+
+    def _evict_for_retry(self, priority: int, deadline: Optional[float]) -> bool:
+        """Close the idle sockets a failed connect may evict, returning whether to try again."""
+        with self._condition:
+            retry = bool(self._get_evictable_sockets(priority)) and (
+                deadline is None or time.monotonic() < deadline
+            )
+            if retry:
+                self._free_sockets(priority=priority)
+        return retry
+
+    def _connect_socket(self, key: Tuple, connect_args: Tuple, priority: int):
+        """Connect and register a new socket, using room already reserved for it."""
+        deadline = connect_args[6]
+        # raise before looking up the host if the deadline has already passed
+        _get_timeout(None, deadline)
+        addr_info = self._resolve_key(key)
+
+        try:
+            if self._hedging is None or self._hedging.percentile is None:
+                socket, connect_time = self._get_connected_socket(addr_info, *connect_args)
+            else:
+                from adafruit_connection_manager.hedge import hedged_connect
+
+                socket, connect_time = hedged_connect(self, addr_info, connect_args)
+        except (MemoryError, OSError, RuntimeError):
+            # Could not get a new socket (or two, if SSL).
+            # Re-raise exception if no sockets could be freed.
+            if not self._evict_for_retry(priority, deadline):
+                raise
+            socket, connect_time = self._get_connected_socket(addr_info, *connect_args)
+
+        with self._condition:
+            self._reserved_socket_count -= 1
+            self._connecting_keys.discard(key)
+            return self._register_connected_socket(
+                key, socket, priority, connect_time, connect_args
+            )
+
+    def _resolve_and_connect(self, key: Tuple, connect_args: Tuple):
+        """Look up the host and connect a new socket, returning it and how long that took."""
+        _get_timeout(None, connect_args[6])
+        addr_info = self._resolve_key(key)
+        return self._get_connected_socket(addr_info, *connect_args)
+
+    def get_socket(
+        self,
+        host: str,
+        port: int,
+        proto: str,
+        session_id: Optional[str] = None,
+        *,
+        timeout: float = 1.0,
+        is_ssl: bool = False,
+        ssl_context: Optional[SSLContextType] = None,
+        connect_timeout: Optional[float] = None,
+        tls_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        auto_session: bool = False,
+        adaptive_timeout: bool = False,
+        priority: int = 0,
+        wait_timeout: Optional[float] = None,
+        proxy: Optional[Tuple[str, int]] = None,
+        proxy_headers: Optional[dict] = None,
+    ) -> CircuitPythonSocketType:
+        """
+        Get a new socket and connect to the given host.
+
+        :param str host: host to connect to, such as ``"www.example.org"``; numeric IP
+          addresses are connected to without looking them up
+        :param int port: port to use for connection, such as ``80`` or ``443``
+        :param str proto: connection protocol: ``"http:"``, ``"https:"``, etc. With
+          ``"unix:"``, ``host`` is the path of a unix domain socket to connect to, for socket
+          pools that support them like CPython's
+        :param Optional[str]: unique session ID,
+          used for multiple simultaneous connections to the same host
+        :param float timeout: how long to wait to connect and for each later read, used when
+          ``connect_timeout`` or ``read_timeout`` are not set
+        :param bool is_ssl: ``True`` If the connection is to be over SSL;
+          automatically set when ``proto`` is ``"https:"``
+        :param Optional[SSLContextType]: SSL context to use when making SSL requests
+        :param Optional[float] connect_timeout: how long to wait to connect
+        :param Optional[float] tls_timeout: extra time allowed for the TLS handshake, which
+          happens as part of connecting SSL sockets
+        :param Optional[float] read_timeout: timeout set on the socket once connected
+        :param Optional[float] deadline: `time.monotonic` value by which DNS, connect and the
+          TLS handshake must all be done, including any retry; ``OSError`` is raised past it
+        :param bool auto_session: ``True`` to ignore ``session_id`` and reuse any idle socket
+          to the host, or connect a new one if there are fewer than ``max_sockets_per_origin``;
+          `free_socket` makes it available again the same way
+        :param bool adaptive_timeout: ``True`` to shorten the connect timeout to what connecting
+          to this host and port has taken so far: the smoothed connect time plus four times its
+          variation, no less than ``min_adaptive_timeout``
+        :param int priority: how important the connection is, higher numbers being more
+          important; when out of sockets, only idle sockets of the same or lower priority are
+          closed to make room, so background traffic never evicts more important connections
+        :param Optional[float] wait_timeout: how long to wait for a socket when they are all in
+          use, ``None`` to raise right away; waiting calls get freed sockets in order of
+          ``priority`` and then first come, first served, and ``OSError`` is raised if the wait
+          times out. Waiting needs ``threading``, so on CircuitPython this is ignored
+        :param Optional[Tuple[str, int]] proxy: the host and port of an HTTP proxy to connect
+          through, which is asked to open a tunnel to the host with ``CONNECT``; for SSL, the
+          ``ssl_context`` must be able to wrap the connected tunnel, so the fake SSL context
+          for co-processors that do TLS themselves raises ``ValueError``. Tunnels are reused
+          like other sockets, but only for the same proxy
+        :param Optional[dict] proxy_headers: extra headers for the ``CONNECT`` request, like
+          ``{"Proxy-Authorization": "Basic ..."}``
+        """
+        waiter = None
+        if wait_timeout is not None and Condition is not None:
+            wait_until = time.monotonic() + wait_timeout
+            if deadline is not None:
+                wait_until = min(wait_until, deadline)
+            waiter_key = (host, port, proto, str(session_id) if session_id else None)
+            if proxy is not None:
+                waiter_key += (tuple(proxy),)
+            waiter = _Waiter(waiter_key, auto_session, priority)
+
+        while True:
+            with self._condition:
+                had_room = waiter is not None and waiter.granted
+                if waiter is not None:
+                    if waiter.socket is not None:
+                        return waiter.socket
+                    if had_room:
+                        # give back the room granted and claim it below, while holding the lock
+                        waiter.granted = False
+                        self._reserved_socket_count -= 1
+
+                try:
+                    key, socket, connect_args = self._prepare_socket(
+                        host,
+                        port,
+                        proto,
+                        session_id,
+                        timeout=timeout,
+                        is_ssl=is_ssl,
+                        ssl_context=ssl_context,
+                        connect_timeout=connect_timeout,
+                        tls_timeout=tls_timeout,
+                        read_timeout=read_timeout,
+                        deadline=deadline,
+                        auto_session=auto_session,
+                        adaptive_timeout=adaptive_timeout,
+                        priority=priority,
+                        proxy=proxy,
+                        proxy_headers=proxy_headers,
+                    )
+                except RuntimeError:
+                    if had_room:
+                        self._grant_room()
+                    if waiter is None or self._draining:
+                        raise
+                    # wait for one of the sockets for the session or host to be freed
+                    waiter.needs_room = False
+                    self._wait_for_socket(waiter, wait_until)
+                    continue
+                except ValueError:
+                    if had_room:
+                        self._grant_room()
+                    raise
+
+                if socket is not None:
+                    if had_room:
+                        self._grant_room()
+                    return socket
+
+                if not self._has_room():
+                    # close idle sockets no more important than this one to make room
+                    self._free_sockets(priority=priority)
+                    if not self._has_room():
+                        if waiter is None:
+                            raise RuntimeError("Maximum number of sockets reached")
+                        waiter.needs_room = True
+                        self._wait_for_socket(waiter, wait_until)
+                        continue
+                self._reserved_socket_count += 1
+                self._connecting_keys.add(key)
+
+            try:
+                return self._connect_socket(key, connect_args, priority)
+            except Exception as error:
+                with self._condition:
+                    self._release_room(key)
+                    if waiter is None or not isinstance(error, (MemoryError, RuntimeError)):
+                        raise
+                    # out of sockets on the radio, so wait for one to be closed or freed
+                    waiter.needs_room = True
+                    self._wait_for_socket(waiter, wait_until)
+
+    def get_datagram_socket(
+        self,
+        host: str,
+        port: int,
+        session_id: Optional[str] = None,
+        *,
+        timeout: float = 1.0,
+        deadline: Optional[float] = None,
+        priority: int = 0,
+        wait_timeout: Optional[float] = None,
+    ) -> CircuitPythonSocketType:
+        """
+        Get a UDP socket connected to the given host, for ``send`` and ``recv``.
+
+        Datagram sockets are managed like the ones from `get_socket`, using the protocol
+        ``"udp:"``: they count towards ``max_sockets``, are given back with `free_socket` to be
+        reused for the same host and port, and are closed with `close_socket`.
+
+        :param str host: host to send to, such as ``"pool.ntp.org"``
+        :param int port: port to send to, such as ``123``
+        :param Optional[str]: unique session ID,
+          used for multiple simultaneous sockets to the same host
+        :param float timeout: how long to wait for each read
+        :param Optional[float] deadline: `time.monotonic` value by which the socket must be
+          ready, see `get_socket`
+        :param int priority: how important the socket is, see `get_socket`
+        :param Optional[float] wait_timeout: how long to wait for a socket when they are all in
+          use, see `get_socket`
+        """
+        if not hasattr(self._socket_pool, "SOCK_DGRAM"):
+            raise ValueError("This socket pool does not support UDP")
+        return self.get_socket(
+            host,
+            port,
+            "udp:",
+            session_id,
+            timeout=timeout,
+            deadline=deadline,
+            priority=priority,
+            wait_timeout=wait_timeout,
+        )
+
+    def get_sockets(self, requests: List[dict], max_workers: Optional[int] = None) -> list:
+        """
+        Get sockets for several connections at once, connecting the new ones concurrently.
+
+        :param List[dict] requests: the `get_socket` arguments for each connection, except
+          ``wait_timeout`` since a batch doesn't wait for sockets, like
+          ``{"host": "www.example.org", "port": 443, "proto": "https:", "ssl_context": ctx}``
+        :param Optional[int] max_workers: how many connections to make at once; by default
+          they are concurrent (using threads) for CPython sockets and one at a time otherwise
+        :return: for each request in order, the socket or the exception raised getting it
+        """
+        from adafruit_connection_manager.batch import get_sockets
+
+        return get_sockets(self, requests, max_workers)
+
+    def wait_readable(
+        self, sockets: List[SocketType], timeout: Optional[float] = None
+    ) -> List[SocketType]:
+        """
+        Wait until any of the given managed sockets has data to read.
+
+        Uses ``select.poll`` (or ``select.select``) when the sockets support it, otherwise
+        polls sockets that report how much data is available, like the ESP32SPI ones. Sockets
+        that can't report either way are returned as ready.
+
+        :param List[SocketType] sockets: the managed sockets to wait on
+        :param Optional[float] timeout: how long to wait, ``None`` waits forever
+        :return: the sockets ready to read, empty if the timeout passed first
+        """
+        from adafruit_connection_manager.wait import wait_readable
+
+        return wait_readable(self, sockets, timeout)
+
+
+def connection_manager_close_all(
+    socket_pool: Optional[SocketpoolModuleType] = None,
+    release_references: bool = False,
+    drain_timeout: Optional[float] = None,
+) -> None:
+    """
+    Close all open sockets for pool, optionally release references.
+
+    Sockets from CPython's socket pool are closed at the same time, so slow closes (like TLS
+    sending close_notify) don't add up.
+
+    :param Optional[SocketpoolModuleType] socket_pool:
+      a specific socket pool whose sockets you want to close; ``None`` means all socket pools
+    :param bool release_references: ``True`` if you also want the `ConnectionManager` to forget
+      all the socket pools and SSL contexts it knows about
+    :param Optional[float] drain_timeout: how long to wait for sockets in use to be given back
+      before closing them, see `ConnectionManager.drain`; ``None`` closes them right away
+    """
+    if socket_pool:
+        socket_pools = [socket_pool]
+    else:
+        socket_pools = list(_global_connection_managers.keys())
+
+    connection_managers = []
+    for pool in socket_pools:
+        connection_manager = _global_connection_managers.get(pool, None)
+        if connection_manager is None:
+            raise RuntimeError("SocketPool not managed")
+        connection_managers.append(connection_manager)
+
+    if drain_timeout is not None:
+        # stop them all handing out sockets, then wait for them together
+        end = time.monotonic() + drain_timeout
+        for connection_manager in connection_managers:
+            connection_manager.drain(0)
+        for connection_manager in connection_managers:
+            connection_manager.drain(max(end - time.monotonic(), 0))
+
+    for pool, connection_manager in zip(socket_pools, connection_managers):
+        connection_manager._close_all_sockets()
+        connection_manager.resume()
+
+        if not release_references:
+            continue
+
+        key = _global_key_by_socketpool.pop(pool)
+        if key:
+            _global_socketpools.pop(key, None)
+            _global_ssl_contexts.pop(key, None)
+
+        _global_connection_managers.pop(pool, None)
+
+
+def get_connection_manager(socket_pool: SocketpoolModuleType) -> ConnectionManager:
+    """
+    Get or create the ConnectionManager singleton for the given pool.
+    """
+    connection_manager = _global_connection_managers.get(socket_pool)
+    if connection_manager is None:
+        connection_manager = ConnectionManager(socket_pool)
+        _global_connection_managers[socket_pool] = connection_manager
+        if _global_weakref is not None:
+            connection_manager._kept_while_busy = True
+            # only its idle sockets are left to close, since it's kept while any are in use
+            _global_weakref.finalize(
+                connection_manager, _close_sockets, connection_manager._managed_socket_by_key
+            )
+    return connection_manager
+
+
+def __getattr__(name: str):
+    # Load the rarely used parts of the library on first use. Boards without module
+    # __getattr__ support can import them from their modules directly.
+    if name == "MultiConnectionManager":
+        from adafruit_connection_manager.multi import MultiConnectionManager
+
+        return MultiConnectionManager
+    if name in {"_FakeSSLContext", "_FakeSSLSocket"}:
+        from adafruit_connection_manager import fake_ssl
+
+        return getattr(fake_ssl, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
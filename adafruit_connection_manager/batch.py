@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.batch`
+================================================================================
+
+Getting several sockets at once
+
+* Author(s): Justin Myers
+"""
+
+import sys
+
+if not sys.implementation.name == "circuitpython":
+    from typing import List, Optional
+
+    from adafruit_connection_manager import ConnectionManager
+
+
+def _get_capacity(connection_manager: ConnectionManager) -> int:
+    return (
+        connection_manager._max_sockets
+        - connection_manager.managed_socket_count
+        - connection_manager._reserved_socket_count
+    )
+
+
+def _make_room(connection_manager: ConnectionManager, priority: int) -> bool:
+    """Close idle sockets no more important than ``priority`` until one more socket fits."""
+    while _get_capacity(connection_manager) <= 0:
+        evictable = connection_manager._get_evictable_sockets(priority)
+        if not evictable:
+            return False
+        # the least important, and then least recently used, goes first
+        connection_manager.close_socket(
+            min(
+                evictable,
+                key=lambda socket: (
+                    connection_manager._record_by_managed_socket[socket].priority,
+                    connection_manager._record_by_managed_socket[socket].last_used,
+                ),
+            )
+        )
+    return True
+
+
+def get_sockets(
+    connection_manager: ConnectionManager, requests: List[dict], max_workers: Optional[int] = None
+) -> list:
+    """See `ConnectionManager.get_sockets`"""
+    results = [None] * len(requests)
+    pending = []
+    pending_keys = set()
+    with connection_manager._condition:
+        for index, request in enumerate(requests):
+            try:
+                key, socket, connect_args = connection_manager._prepare_socket(
+                    reserved_keys=pending_keys, **request
+                )
+                if key in pending_keys:
+                    raise RuntimeError(
+                        f"An existing socket is already connected to {key[2]}//{key[0]}:{key[1]}"
+                    )
+            except (RuntimeError, TypeError, ValueError) as error:
+                # including arguments get_sockets doesn't take, like wait_timeout
+                results[index] = error
+                continue
+            if socket is None:
+                pending.append((index, key, connect_args))
+                pending_keys.add(key)
+            else:
+                results[index] = socket
+
+        if connection_manager._max_sockets is not None and pending:
+            # when there isn't room for all of them, the most important requests get the sockets
+            pending.sort(key=lambda item: -requests[item[0]].get("priority", 0))
+            allowed = []
+            for item in pending:
+                if not _make_room(connection_manager, requests[item[0]].get("priority", 0)):
+                    results[item[0]] = RuntimeError("Maximum number of sockets reached")
+                    continue
+                allowed.append(item)
+                connection_manager._reserved_socket_count += 1
+                connection_manager._connecting_keys.add(item[1])
+            pending = allowed
+        else:
+            connection_manager._reserved_socket_count += len(pending)
+            connection_manager._connecting_keys.update(key for _, key, _ in pending)
+
+    if max_workers is None:
+        is_cpython_pool = getattr(connection_manager._socket_pool, "__name__", None) == "socket"
+        max_workers = len(pending) if is_cpython_pool else 1
+
+    if max_workers > 1 and len(pending) > 1:
+        try:
+            from concurrent.futures import ThreadPoolExecutor
+        except ImportError:
+            max_workers = 1
+
+    if max_workers > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(connection_manager._resolve_and_connect, key, connect_args)
+                for _, key, connect_args in pending
+            ]
+        outcomes = [future.exception() or future.result() for future in futures]
+    else:
+        outcomes = []
+        for _, key, connect_args in pending:
+            try:
+                outcomes.append(connection_manager._resolve_and_connect(key, connect_args))
+            except Exception as error:
+                outcomes.append(error)
+
+    for position, (index, key, connect_args) in enumerate(pending):
+        if not isinstance(outcomes[position], (MemoryError, OSError, RuntimeError)):
+            continue
+        # maybe out of sockets on the radio, so like get_socket, close idle ones and try again
+        priority = requests[index].get("priority", 0)
+        if connection_manager._evict_for_retry(priority, connect_args[6]):
+            try:
+                outcomes[position] = connection_manager._resolve_and_connect(key, connect_args)
+            except Exception as error:
+                outcomes[position] = error
+
+    with connection_manager._condition:
+        for (index, key, connect_args), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                connection_manager._release_room(key)
+                results[index] = outcome
+            else:
+                connection_manager._reserved_socket_count -= 1
+                connection_manager._connecting_keys.discard(key)
+                results[index] = connection_manager._register_connected_socket(
+                    key, outcome[0], requests[index].get("priority", 0), outcome[1], connect_args
+                )
+
+    return results
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.drain`
+================================================================================
+
+Draining the sockets in use for a clean shutdown, and closing them all at the same time
+
+* Author(s): Justin Myers
+"""
+
+import sys
+import time
+
+try:
+    from threading import Thread
+except ImportError:
+    # No threads to give sockets back, like on CircuitPython
+    Thread = None
+
+if not sys.implementation.name == "circuitpython":
+    from typing import Optional
+
+    from adafruit_connection_manager import ConnectionManager
+
+
+def drain(connection_manager: ConnectionManager, timeout: Optional[float]) -> bool:
+    """See `ConnectionManager.drain`"""
+    with connection_manager._condition:
+        connection_manager._draining = True
+        # wake the waiting callers, who find the manager draining
+        for waiter in connection_manager._waiters:
+            waiter.granted = True
+            connection_manager._reserved_socket_count += 1
+        connection_manager._waiters = []
+        connection_manager._condition.notify_all()
+        connection_manager._free_sockets()
+
+        end = None if timeout is None else time.monotonic() + timeout
+        while (
+            connection_manager.managed_socket_count + connection_manager._reserved_socket_count > 0
+        ):
+            remaining = None if end is None else end - time.monotonic()
+            if Thread is None or (remaining is not None and remaining <= 0):
+                return False
+            connection_manager._condition.wait(remaining)
+        return True
+
+
+def close_all_sockets(connection_manager: ConnectionManager) -> None:
+    """Close all the managed sockets at the same time, each in its own thread."""
+    # forget them all first, so a slow close (like TLS's close_notify) doesn't hold the lock
+    with connection_manager._condition:
+        sockets = list(connection_manager._record_by_managed_socket)
+        keys = [connection_manager._forget_socket(socket) for socket in sockets]
+    threads = [Thread(target=socket.close, daemon=True) for socket in sockets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with connection_manager._condition:
+        for key in keys:
+            connection_manager._grant_room(key)
@@ -0,0 +1,101 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.fake_ssl`
+================================================================================
+
+SSL context for radios that do TLS themselves, like the ESP32 co-processor
+
+* Author(s): Justin Myers
+"""
+
+import errno
+import sys
+
+if not sys.implementation.name == "circuitpython":
+    from typing import Optional, Tuple
+
+    from circuitpython_typing.socket import (
+        CircuitPythonSocketType,
+        InterfaceType,
+        SocketpoolModuleType,
+    )
+
+
+class _FakeSSLSocket:
+    __slots__ = ("_socket", "_mode")
+
+    # the co-processor does TLS, and needs the host name to connect
+    _connects_by_name = True
+
+    def __init__(self, socket: CircuitPythonSocketType, tls_mode: int) -> None:
+        self._socket = socket
+        self._mode = tls_mode
+
+    # For sockets that come from software socketpools (like the esp32api), they track
+    # the interface and socket pool. We need to make sure the clones do as well
+    @property
+    def _interface(self):
+        return getattr(self._socket, "_interface", None)
+
+    @property
+    def _socket_pool(self):
+        return getattr(self._socket, "_socket_pool", None)
+
+    def settimeout(self, *args):
+        """Pass through to the wrapped socket"""
+        return self._socket.settimeout(*args)
+
+    def send(self, *args):
+        """Pass through to the wrapped socket"""
+        return self._socket.send(*args)
+
+    def recv(self, *args):
+        """Pass through to the wrapped socket"""
+        return self._socket.recv(*args)
+
+    def recv_into(self, *args):
+        """Pass through to the wrapped socket"""
+        return self._socket.recv_into(*args)
+
+    def close(self):
+        """Pass through to the wrapped socket"""
+        return self._socket.close()
+
+    def connect(self, address: Tuple[str, int]) -> None:
+        """Connect wrapper to add non-standard mode parameter"""
+        try:
+            return self._socket.connect(address, self._mode)
+        except RuntimeError as error:
+            raise OSError(errno.ENOMEM, str(error)) from error
+
+
+class _FakeSSLContext:
+    __slots__ = ("_iface",)
+
+    # its sockets need the host name to connect, so TLS can't be run through a proxy tunnel
+    _connects_by_name = True
+
+    def __init__(self, iface: InterfaceType) -> None:
+        self._iface = iface
+
+    def wrap_socket(
+        self, socket: CircuitPythonSocketType, server_hostname: Optional[str] = None
+    ) -> _FakeSSLSocket:
+        """Return the same socket"""
+        if hasattr(self._iface, "TLS_MODE"):
+            return _FakeSSLSocket(socket, self._iface.TLS_MODE)
+
+        raise ValueError("This radio does not support TLS/HTTPS")
+
+
+def create_fake_ssl_context(
+    socket_pool: SocketpoolModuleType, iface: InterfaceType
+) -> _FakeSSLContext:
+    """See `adafruit_connection_manager.create_fake_ssl_context`"""
+    if hasattr(socket_pool, "set_interface"):
+        # this is to manually support legacy hardware like the fona
+        socket_pool.set_interface(iface)
+
+    return _FakeSSLContext(iface)
@@ -0,0 +1,175 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.hedge`
+================================================================================
+
+Hedged connects, starting a second attempt when the first is slower than usual
+
+* Author(s): Justin Myers
+"""
+
+import sys
+import time
+from threading import Thread
+
+if not sys.implementation.name == "circuitpython":
+    from typing import Optional, Tuple
+
+    from adafruit_connection_manager import ConnectionManager
+
+# How many recent connect times to keep for each origin
+_SAMPLES_TO_KEEP = 32
+
+
+class _Hedging:
+    """The hedging settings, with the connect times and counts it keeps."""
+
+    def __init__(self) -> None:
+        self.percentile = None
+        self.budget = 0.0
+        self.min_delay = 0.0
+        self.min_samples = 0
+        self.samples_by_origin = {}
+        self.tokens = 1.0
+        self.connect_count = 0
+        self.hedge_count = 0
+        self.win_count = 0
+
+    def add_connect_time(self, host: str, port: int, elapsed: float) -> None:
+        """Keep a recent connect time, for the percentile hedging waits for."""
+        if self.percentile is None:
+            return
+        samples = self.samples_by_origin.setdefault((host, port), [])
+        samples.append(elapsed)
+        if len(samples) > _SAMPLES_TO_KEEP:
+            samples.pop(0)
+
+
+class _Race:
+    """The attempts to connect one socket, the first to connect winning."""
+
+    __slots__ = ("started", "finished", "hedged", "winner", "winner_index", "error")
+
+    def __init__(self) -> None:
+        self.started = 0
+        self.finished = 0
+        self.hedged = False
+        self.winner = None
+        self.winner_index = None
+        self.error = None
+
+
+def _get_hedge_delay(
+    connection_manager: ConnectionManager, host: str, port: int
+) -> Optional[float]:
+    """Get how long to wait before hedging, ``None`` if too few connects were seen yet."""
+    hedging = connection_manager._hedging
+    samples = hedging.samples_by_origin.get((host, port))
+    if samples is None or len(samples) < hedging.min_samples:
+        return None
+    samples = sorted(samples)
+    delay = samples[int(hedging.percentile * (len(samples) - 1))]
+    return max(delay, hedging.min_delay)
+
+
+def _attempt(
+    connection_manager: ConnectionManager, race: _Race, index: int, addr_info, connect_args
+) -> None:
+    """Connect one attempt, closing the socket if another attempt already won."""
+    result = None
+    error = None
+    try:
+        result = connection_manager._get_connected_socket(addr_info, *connect_args)
+    except Exception as exc:
+        error = exc
+
+    with connection_manager._condition:
+        race.finished += 1
+        if result is not None and race.winner is None:
+            race.winner = result
+            race.winner_index = index
+            result = None
+        elif error is not None:
+            race.error = error
+        if race.hedged and race.finished == race.started:
+            # both attempts are done, so give back the room taken by the hedge
+            connection_manager._release_room()
+        connection_manager._condition.notify_all()
+
+    if result is not None:
+        # lost the race
+        result[0].close()
+
+
+def _start_attempt(
+    connection_manager: ConnectionManager, race: _Race, addr_info, connect_args
+) -> None:
+    index = race.started
+    race.started += 1
+    Thread(
+        target=_attempt,
+        args=(connection_manager, race, index, addr_info, connect_args),
+        daemon=True,
+    ).start()
+
+
+def configure_hedging(
+    connection_manager: ConnectionManager,
+    percentile: float,
+    budget: float,
+    min_delay: float,
+    min_samples: int,
+) -> None:
+    """See `ConnectionManager.configure_hedging`"""
+    if not 0 < percentile < 1:
+        raise ValueError("percentile must be between 0 and 1")
+    hedging = connection_manager._hedging
+    if hedging is None:
+        hedging = _Hedging()
+    hedging.percentile = percentile
+    hedging.budget = budget
+    hedging.min_delay = min_delay
+    hedging.min_samples = min_samples
+    connection_manager._hedging = hedging
+
+
+def hedged_connect(connection_manager: ConnectionManager, addr_info, connect_args) -> Tuple:
+    """Connect like ``ConnectionManager._get_connected_socket``, hedging slow connects."""
+    host, port = connect_args[:2]
+    hedging = connection_manager._hedging
+    with connection_manager._condition:
+        # each connect earns part of a hedge, so hedges stay within the budget
+        hedging.tokens = min(hedging.tokens + hedging.budget, 1.0)
+        hedging.connect_count += 1
+        delay = _get_hedge_delay(connection_manager, host, port)
+    if delay is None:
+        return connection_manager._get_connected_socket(addr_info, *connect_args)
+
+    race = _Race()
+    hedge_at = time.monotonic() + delay
+    with connection_manager._condition:
+        _start_attempt(connection_manager, race, addr_info, connect_args)
+        checked_hedge = False
+        while race.winner is None and race.finished < race.started:
+            remaining = None
+            if not checked_hedge:
+                remaining = hedge_at - time.monotonic()
+                if remaining <= 0:
+                    checked_hedge = True
+                    remaining = None
+                    if hedging.tokens >= 1 and connection_manager._has_room():
+                        hedging.tokens -= 1
+                        connection_manager._reserved_socket_count += 1
+                        hedging.hedge_count += 1
+                        race.hedged = True
+                        _start_attempt(connection_manager, race, addr_info, connect_args)
+                        continue
+            connection_manager._condition.wait(remaining)
+
+        if race.winner is None:
+            raise race.error
+        if race.winner_index:
+            hedging.win_count += 1
+        return race.winner
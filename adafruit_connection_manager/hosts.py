@@ -0,0 +1,38 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.hosts`
+================================================================================
+
+Pinning host names to addresses, so connecting to them skips looking them up
+
+* Author(s): Justin Myers
+"""
+
+import sys
+
+if not sys.implementation.name == "circuitpython":
+    from adafruit_connection_manager import ConnectionManager
+
+
+def add_hosts(connection_manager: ConnectionManager, hosts: dict) -> None:
+    """See `ConnectionManager.add_hosts`"""
+    pinned_hosts = {}
+    for name, value in hosts.items():
+        addresses = [value] if isinstance(value, str) else list(value)
+        if not addresses:
+            raise ValueError(f"No addresses for host: {name}")
+        pinned_hosts[name.lower()] = addresses
+    connection_manager._hosts.update(pinned_hosts)
+
+
+def load_hosts(connection_manager: ConnectionManager, path: str) -> None:
+    """See `ConnectionManager.load_hosts`"""
+    hosts = {}
+    with open(path) as hosts_file:
+        for line in hosts_file:
+            parts = line.split("#", 1)[0].split()
+            for name in parts[1:]:
+                hosts.setdefault(name, []).append(parts[0])
+    add_hosts(connection_manager, hosts)
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.maintain`
+================================================================================
+
+Closing idle sockets and keeping warm ones connected, from the main loop or a reaper thread
+
+* Author(s): Justin Myers
+"""
+
+import sys
+import time
+
+if not sys.implementation.name == "circuitpython":
+    from typing import Tuple
+
+    from adafruit_connection_manager import ConnectionManager
+
+
+def open_idle_socket(
+    connection_manager: ConnectionManager, key: Tuple, connect_args: Tuple, priority: int = 0
+) -> bool:
+    """Connect a socket, using room already reserved for it, and make it available."""
+    try:
+        # nobody is waiting for it, so unlike _connect_socket it never evicts idle sockets
+        socket, connect_time = connection_manager._resolve_and_connect(key, connect_args)
+    except Exception:
+        # the next get_socket connects instead
+        with connection_manager._condition:
+            connection_manager._release_room(key)
+        return False
+    with connection_manager._condition:
+        connection_manager._reserved_socket_count -= 1
+        connection_manager._connecting_keys.discard(key)
+        socket = connection_manager._register_connected_socket(
+            key, socket, priority, connect_time, connect_args
+        )
+        connection_manager._record_by_managed_socket[socket].checkouts = 0
+        connection_manager.free_socket(socket)
+    return True
+
+
+def _close_expired_sockets(connection_manager: ConnectionManager) -> int:
+    """Close the idle sockets that can't be reused, returning how many were closed."""
+    closed = 0
+    now = time.monotonic()
+    for socket in list(connection_manager._available_sockets):
+        record = connection_manager._record_by_managed_socket[socket]
+        settings = connection_manager._origin_settings.get(record.key[:2])
+        idle_timeout = connection_manager._idle_timeout
+        if settings is not None and settings["idle_timeout"] is not None:
+            idle_timeout = settings["idle_timeout"]
+        if (
+            record.generation != connection_manager._generation
+            or connection_manager._is_worn_out(record)
+            or (idle_timeout is not None and now - record.last_used >= idle_timeout)
+        ):
+            connection_manager.close_socket(socket)
+            closed += 1
+    return closed
+
+
+def _reserve_refills(connection_manager: ConnectionManager) -> list:
+    """Reserve room for the idle sockets origins need for their ``min_idle``."""
+    refills = []
+    for origin, settings in connection_manager._origin_settings.items():
+        if not settings["min_idle"] or origin not in connection_manager._connect_args_by_origin:
+            continue
+        proto, key_suffix, connect_args = connection_manager._connect_args_by_origin[origin]
+        idle = sum(
+            1
+            for socket in connection_manager._available_sockets
+            if connection_manager._record_by_managed_socket[socket].key[:2] == origin
+        )
+        for slot in range(connection_manager._max_sockets_per_origin):
+            if (
+                idle >= settings["min_idle"]
+                or connection_manager._draining
+                or connection_manager._waiters
+                or not connection_manager._has_room()
+            ):
+                break
+            key = origin + (proto, slot) + key_suffix
+            if (
+                key in connection_manager._managed_socket_by_key
+                or key in connection_manager._connecting_keys
+            ):
+                continue
+            connection_manager._reserved_socket_count += 1
+            connection_manager._connecting_keys.add(key)
+            refills.append((key, connect_args))
+            idle += 1
+    return refills
+
+
+def maintain(connection_manager: ConnectionManager) -> dict:
+    """See `ConnectionManager.maintain`"""
+    with connection_manager._condition:
+        closed = _close_expired_sockets(connection_manager)
+        refills = _reserve_refills(connection_manager)
+
+    opened = 0
+    for key, connect_args in refills:
+        if open_idle_socket(connection_manager, key, connect_args):
+            opened += 1
+    return {"closed": closed, "opened": opened}
+
+
+def start_reaper(connection_manager: ConnectionManager, interval: float) -> None:
+    """See `ConnectionManager.start_reaper`"""
+    from threading import Event, Thread
+
+    stop = Event()
+
+    def reap():
+        while not stop.wait(interval):
+            connection_manager.maintain()
+
+    connection_manager._reaper = stop
+    Thread(target=reap, daemon=True).start()
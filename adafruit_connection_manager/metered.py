@@ -0,0 +1,56 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.metered`
+================================================================================
+
+Socket wrapper counting the bytes sent and received, for ``meter_sockets``
+
+* Author(s): Justin Myers
+"""
+
+import sys
+
+if not sys.implementation.name == "circuitpython":
+    from circuitpython_typing.socket import CircuitPythonSocketType
+
+    from adafruit_connection_manager import _SocketRecord
+
+
+class _MeteredSocket:
+    __slots__ = ("_socket", "_record")
+
+    def __init__(self, socket: CircuitPythonSocketType, record: _SocketRecord) -> None:
+        self._socket = socket
+        self._record = record
+
+    def __getattr__(self, name: str):
+        # everything that isn't counted is passed through to the wrapped socket
+        return getattr(self._socket, name)
+
+    def send(self, *args):
+        """Pass through to the wrapped socket, counting the bytes sent"""
+        sent = self._socket.send(*args)
+        if sent:
+            self._record.bytes_sent += sent
+        return sent
+
+    def sendall(self, data, *args):
+        """Pass through to the wrapped socket, counting the bytes sent"""
+        result = self._socket.sendall(data, *args)
+        self._record.bytes_sent += len(data)
+        return result
+
+    def recv(self, *args):
+        """Pass through to the wrapped socket, counting the bytes received"""
+        data = self._socket.recv(*args)
+        self._record.bytes_received += len(data)
+        return data
+
+    def recv_into(self, *args):
+        """Pass through to the wrapped socket, counting the bytes received"""
+        received = self._socket.recv_into(*args)
+        if received:
+            self._record.bytes_received += received
+        return received
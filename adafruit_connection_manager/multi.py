@@ -0,0 +1,202 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.multi`
+================================================================================
+
+Managing sockets across several radios
+
+* Author(s): Justin Myers
+"""
+
+import errno
+import sys
+import time
+
+from adafruit_connection_manager import (
+    ConnectionManager,
+    get_connection_manager,
+    get_radio_socketpool,
+    get_radio_ssl_context,
+)
+
+if not sys.implementation.name == "circuitpython":
+    from typing import List, Optional
+
+    from circuitpython_typing.socket import CircuitPythonSocketType, SocketType
+
+
+# OSError messages for a pool that's busy, not a link that failed
+_BUSY_MESSAGES = ("Timed out waiting for a socket", "Deadline exceeded")
+
+
+def _is_out_of_capacity(error: Exception) -> bool:
+    """Whether connecting failed because the radio or pool had no room, not its link."""
+    if isinstance(error, MemoryError):
+        return True
+    if not isinstance(error, OSError) or not error.args:
+        return False
+    if error.args[0] == errno.ENOMEM:
+        return True
+    return (
+        error.args[0] == errno.ETIMEDOUT and len(error.args) > 1 and error.args[1] in _BUSY_MESSAGES
+    )
+
+
+class _Interface:
+    """A radio's connection manager and SSL context, and whether it's working."""
+
+    __slots__ = ("connection_manager", "ssl_context", "failures", "down_until")
+
+    def __init__(self, connection_manager: ConnectionManager, ssl_context) -> None:
+        self.connection_manager = connection_manager
+        self.ssl_context = ssl_context
+        self.failures = 0
+        self.down_until = None
+
+
+class MultiConnectionManager:
+    """
+    Manage sockets across several radios, like onboard WiFi and a WIZNET5K, routing each new
+    connection to one of them and failing over when connecting fails.
+
+    :param list radios: the radios to use, in order of preference
+    :param str policy: how to pick a radio for a new connection: ``"failover"`` uses the first
+      one that's up, ``"least_connections"`` the one with the fewest managed sockets and
+      ``"affinity"`` the one last used for the host (or the least connected for a new host)
+    :param int max_failures: how many connect failures in a row mark a radio as down
+    :param float retry_after: how many seconds a radio stays down before it's tried again
+    """
+
+    def __init__(
+        self,
+        radios: list,
+        *,
+        policy: str = "failover",
+        max_failures: int = 1,
+        retry_after: float = 30.0,
+    ) -> None:
+        if policy not in {"failover", "least_connections", "affinity"}:
+            raise ValueError(f"Unsupported policy: {policy}")
+        self._policy = policy
+        self._max_failures = max_failures
+        self._retry_after = retry_after
+        self._interfaces = []
+        self._interface_by_host = {}
+        for radio in radios:
+            socket_pool = get_radio_socketpool(radio)
+            self._interfaces.append(
+                _Interface(get_connection_manager(socket_pool), get_radio_ssl_context(radio))
+            )
+
+    def _get_interfaces(self, host: str) -> List[_Interface]:
+        """Get the interfaces to try, best first and the ones marked down last."""
+        now = time.monotonic()
+        up = []
+        down = []
+        for interface in self._interfaces:
+            if interface.down_until is None or interface.down_until <= now:
+                up.append(interface)
+            else:
+                down.append(interface)
+
+        if self._policy == "least_connections":
+            up.sort(key=lambda interface: interface.connection_manager.managed_socket_count)
+        elif self._policy == "affinity":
+            up.sort(key=lambda interface: interface.connection_manager.managed_socket_count)
+            interface = self._interface_by_host.get(host)
+            if interface in up:
+                up.remove(interface)
+                up.insert(0, interface)
+        return up + down
+
+    def _get_connection_manager(self, socket: SocketType) -> ConnectionManager:
+        for interface in self._interfaces:
+            if socket in interface.connection_manager._record_by_managed_socket:
+                return interface.connection_manager
+        raise RuntimeError("Socket not managed")
+
+    @property
+    def available_socket_count(self) -> int:
+        """Get the count of available (freed) managed sockets across all radios."""
+        return sum(
+            interface.connection_manager.available_socket_count for interface in self._interfaces
+        )
+
+    @property
+    def managed_socket_count(self) -> int:
+        """Get the count of managed sockets across all radios."""
+        return sum(
+            interface.connection_manager.managed_socket_count for interface in self._interfaces
+        )
+
+    def close_socket(self, socket: SocketType) -> None:
+        """Close a managed socket, see `ConnectionManager.close_socket`."""
+        self._get_connection_manager(socket).close_socket(socket)
+
+    def free_socket(self, socket: SocketType) -> None:
+        """Mark a managed socket as available for reuse, see `ConnectionManager.free_socket`."""
+        self._get_connection_manager(socket).free_socket(socket)
+
+    def get_socket(
+        self,
+        host: str,
+        port: int,
+        proto: str,
+        session_id: Optional[str] = None,
+        **kwargs,
+    ) -> CircuitPythonSocketType:
+        """
+        Get a new socket and connect to the given host, on the radio picked by the policy.
+
+        Takes the same arguments as `ConnectionManager.get_socket`, except that each radio's own
+        SSL context is always used. When connecting fails on one radio, the next is tried. Only
+        failed connects count towards marking a radio down, not running out of sockets or
+        waiting too long for one. A session already connected on a radio stays on it, so asking
+        for it while it's in use raises ``RuntimeError`` like `ConnectionManager.get_socket`.
+        """
+        kwargs.pop("ssl_context", None)
+        interfaces = self._get_interfaces(host)
+        if not kwargs.get("auto_session"):
+            session_key = (host, port, proto, str(session_id) if session_id else None)
+            for interface in interfaces:
+                managed_keys = interface.connection_manager._managed_socket_by_key
+                if any(key[:4] == session_key for key in managed_keys):
+                    # the session's socket is on this radio, to be reused or refused there
+                    interfaces.remove(interface)
+                    interfaces.insert(0, interface)
+                    break
+
+        last_error = None
+        for interface in interfaces:
+            try:
+                socket = interface.connection_manager.get_socket(
+                    host, port, proto, session_id, ssl_context=interface.ssl_context, **kwargs
+                )
+            except (MemoryError, OSError) as error:
+                last_error = error
+                if _is_out_of_capacity(error):
+                    # out of sockets or waited too long, so try the next radio without
+                    # marking this one down
+                    continue
+                interface.failures += 1
+                if interface.failures >= self._max_failures:
+                    interface.down_until = time.monotonic() + self._retry_after
+                continue
+            except (RuntimeError, ValueError) as error:
+                if str(error).startswith("An existing socket is already connected"):
+                    # the session is in use, so another radio mustn't open a duplicate
+                    raise
+                # out of sockets or unsupported on this radio, but not down
+                last_error = error
+                continue
+
+            interface.failures = 0
+            interface.down_until = None
+            self._interface_by_host[host] = interface
+            return socket
+
+        if last_error is None:
+            raise RuntimeError("No radios to connect with")
+        raise last_error
@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.proxy`
+================================================================================
+
+Tunnels through HTTP proxies
+
+* Author(s): Justin Myers
+"""
+
+import errno
+import sys
+
+if not sys.implementation.name == "circuitpython":
+    from typing import Optional
+
+    from circuitpython_typing.socket import CircuitPythonSocketType
+
+# The most of the proxy's response to read before giving up on it
+_MAX_RESPONSE_SIZE = 4096
+_HEADERS_END = b"\r\n\r\n"
+
+
+def _get_bytes_to_end(response: bytes) -> int:
+    """Get how many more bytes could at most end the response's headers."""
+    for matched in (3, 2, 1):
+        if response.endswith(_HEADERS_END[:matched]):
+            return 4 - matched
+    return 4
+
+
+def open_tunnel(
+    socket: CircuitPythonSocketType, host: str, port: int, proxy_headers: Optional[dict] = None
+) -> None:
+    """
+    Ask the HTTP proxy the socket is connected to for a tunnel to the host, with ``CONNECT``.
+
+    :param CircuitPythonSocketType socket: the socket connected to the proxy
+    :param str host: the host to open the tunnel to
+    :param int port: the port to open the tunnel to
+    :param Optional[dict] proxy_headers: extra headers for the ``CONNECT`` request
+    """
+    # IPv6 addresses are bracketed, so their colons aren't taken for the port's
+    target = f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+    request = f"CONNECT {target} HTTP/1.1\r\nHost: {target}\r\n"
+    if proxy_headers:
+        for name, value in proxy_headers.items():
+            request += f"{name}: {value}\r\n"
+    data = (request + "\r\n").encode()
+    while data:
+        sent = socket.send(data)
+        if not sent:
+            raise OSError(errno.ECONNRESET, "Proxy closed the connection")
+        data = data[sent:]
+
+    # the host's first bytes can follow the proxy's response, so never read past its end
+    response = b""
+    buffer = bytearray(4)
+    while not response.endswith(_HEADERS_END):
+        size = socket.recv_into(buffer, _get_bytes_to_end(response))
+        if not size:
+            raise OSError(errno.ECONNRESET, "Proxy closed the connection")
+        response += bytes(buffer[:size])
+        if len(response) > _MAX_RESPONSE_SIZE:
+            raise OSError(errno.EIO, "Proxy response too long")
+
+    status_line = response.split(b"\r\n", 1)[0]
+    status = status_line.split()
+    # any 2xx status means the tunnel is open
+    if len(status) < 2 or len(status[1]) != 3 or not status[1].startswith(b"2"):
+        raise OSError(errno.ECONNREFUSED, f"Proxy refused the tunnel: {status_line.decode()}")
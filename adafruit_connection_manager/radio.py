@@ -0,0 +1,120 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.radio`
+================================================================================
+
+Socket pools and SSL contexts for the supported radios
+
+* Author(s): Justin Myers
+"""
+
+import sys
+
+import adafruit_connection_manager as core
+
+
+def _release_radio_references(key) -> None:
+    core._global_socketpools.pop(key, None)
+    core._global_ssl_contexts.pop(key, None)
+
+
+def _track_socketpool(key, radio=None, pool=None) -> None:
+    """Arrange for a radio's socket pool to be released once unused (or least recently used)."""
+    if core._global_weakref is not None:
+        if radio is None:
+            return
+        for obj in (radio, pool):
+            try:
+                core._global_weakref.finalize(obj, _release_radio_references, key)
+            except TypeError:
+                # not weakly referenceable
+                pass
+
+    elif core._global_max_socketpools is not None:
+        if key in core._global_socketpool_keys:
+            core._global_socketpool_keys.remove(key)
+        while len(core._global_socketpool_keys) >= core._global_max_socketpools:
+            old_key = core._global_socketpool_keys.pop(0)
+            old_pool = core._global_socketpools.get(old_key)
+            if old_pool in core._global_connection_managers:
+                core.connection_manager_close_all(old_pool, release_references=True)
+            _release_radio_references(old_key)
+        core._global_socketpool_keys.append(key)
+
+
+def get_radio_socketpool(radio):
+    """See `adafruit_connection_manager.get_radio_socketpool`"""
+    key = core._get_radio_hash_key(radio)
+    pool = core._global_socketpools.get(key)
+    if pool is None:
+        class_name = radio.__class__.__name__
+        if class_name == "Radio":
+            import ssl
+
+            import socketpool
+
+            pool = socketpool.SocketPool(radio)
+            ssl_context = ssl.create_default_context()
+
+        elif class_name == "ESP_SPIcontrol":
+            import adafruit_esp32spi.adafruit_esp32spi_socketpool as socketpool
+
+            pool = socketpool.SocketPool(radio)
+            ssl_context = core.create_fake_ssl_context(pool, radio)
+
+        elif class_name == "WIZNET5K":
+            import adafruit_wiznet5k.adafruit_wiznet5k_socketpool as socketpool
+
+            pool = socketpool.SocketPool(radio)
+
+            # Note: At this time, SSL/TLS connections are not supported by older
+            # versions of the Wiznet5k library or on boards withouut the ssl module
+            # see https://docs.circuitpython.org/en/latest/shared-bindings/support_matrix.html
+            ssl_context = None
+            implementation_name = sys.implementation.name
+            implementation_version = sys.implementation.version
+            if (
+                pool.SOCK_STREAM == 1
+                and implementation_name == "circuitpython"
+                and implementation_version >= core.WIZNET5K_SSL_SUPPORT_VERSION
+            ):
+                try:
+                    import ssl
+
+                    ssl_context = ssl.create_default_context()
+                except ImportError:
+                    # if SSL not on board, default to fake_ssl_context
+                    pass
+
+            if ssl_context is None:
+                ssl_context = core.create_fake_ssl_context(pool, radio)
+
+        elif class_name == "CPythonNetwork":
+            import socket as pool
+            import ssl
+
+            ssl_context = ssl.create_default_context()
+
+        else:
+            raise ValueError(f"Unsupported radio class: {class_name}")
+
+        core._global_key_by_socketpool[pool] = key
+        core._global_socketpools[key] = pool
+        core._global_ssl_contexts[key] = ssl_context
+        _track_socketpool(key, radio, pool)
+
+    elif core._global_max_socketpools is not None:
+        _track_socketpool(key)
+
+    return pool
+
+
+def get_radio_ssl_context(radio):
+    """See `adafruit_connection_manager.get_radio_ssl_context`"""
+    # hold the pool, so it can't be released before the SSL context is looked up
+    pool = get_radio_socketpool(radio)
+    ssl_context = core._global_ssl_contexts[core._get_radio_hash_key(radio)]
+    del pool
+    return ssl_context
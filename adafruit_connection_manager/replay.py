@@ -0,0 +1,247 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.replay`
+================================================================================
+
+Recording the sockets used through a `ConnectionManager`, and replaying them offline
+
+A recording has one JSON array per line, each an event: the milliseconds since recording
+started, what happened and the lease (one `ConnectionManager.get_socket` call and the socket it
+returned) it happened to. ``get`` events add the `ConnectionManager.get_socket` arguments and
+the connect time in milliseconds (``null`` when a socket was reused), ``send`` and ``recv``
+events add the data in base64, and ``free`` and ``close`` events add nothing more.
+
+* Author(s): Justin Myers
+"""
+
+import binascii
+import json
+import sys
+import time
+
+from adafruit_connection_manager.simulation import SimulatedSocketPool, SimulatedSSLContext
+
+if not sys.implementation.name == "circuitpython":
+    from typing import List, Optional
+
+    from circuitpython_typing.socket import CircuitPythonSocketType
+
+    from adafruit_connection_manager import ConnectionManager
+
+
+def _encode(data) -> str:
+    return binascii.b2a_base64(bytes(data)).strip().decode()
+
+
+def _decode(data: str) -> bytes:
+    return binascii.a2b_base64(data)
+
+
+class _RecordingSocket:
+    __slots__ = ("_socket", "_recorder", "_lease")
+
+    def __init__(
+        self, socket: CircuitPythonSocketType, recorder: "RecordingConnectionManager", lease: int
+    ) -> None:
+        self._socket = socket
+        self._recorder = recorder
+        self._lease = lease
+
+    def __getattr__(self, name: str):
+        # everything that isn't recorded is passed through to the wrapped socket
+        return getattr(self._socket, name)
+
+    def send(self, data, *args):
+        """Pass through to the wrapped socket, recording the data sent"""
+        sent = self._socket.send(data, *args)
+        if sent:
+            self._recorder._record("send", self._lease, _encode(memoryview(data)[:sent]))
+        return sent
+
+    def sendall(self, data, *args):
+        """Pass through to the wrapped socket, recording the data sent"""
+        result = self._socket.sendall(data, *args)
+        self._recorder._record("send", self._lease, _encode(data))
+        return result
+
+    def recv(self, *args):
+        """Pass through to the wrapped socket, recording the data received"""
+        data = self._socket.recv(*args)
+        if data:
+            self._recorder._record("recv", self._lease, _encode(data))
+        return data
+
+    def recv_into(self, buffer, *args):
+        """Pass through to the wrapped socket, recording the data received"""
+        received = self._socket.recv_into(buffer, *args)
+        if received:
+            self._recorder._record("recv", self._lease, _encode(memoryview(buffer)[:received]))
+        return received
+
+
+class RecordingConnectionManager:
+    """
+    Record the sockets used through a `ConnectionManager` to a file, to replay them later
+    with `replay`. Use it in place of the connection manager: the sockets it hands out record
+    the data sent and received, and must be given back to its `free_socket` and
+    `close_socket`.
+
+    :param ConnectionManager connection_manager: the connection manager to record
+    :param str path: the file to write the recording to, like ``"/recording.jsonl"``
+    """
+
+    def __init__(self, connection_manager: ConnectionManager, path: str) -> None:
+        self._connection_manager = connection_manager
+        self._file = open(path, "w")
+        self._start = time.monotonic()
+        self._lease_count = 0
+
+    def __enter__(self) -> "RecordingConnectionManager":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _record(self, *event) -> None:
+        elapsed = int((time.monotonic() - self._start) * 1000)
+        self._file.write(json.dumps([elapsed] + list(event)))
+        self._file.write("\n")
+
+    def close(self) -> None:
+        """Finish the recording, closing its file."""
+        self._file.close()
+
+    def get_socket(
+        self,
+        host: str,
+        port: int,
+        proto: str,
+        session_id: Optional[str] = None,
+        **kwargs,
+    ) -> CircuitPythonSocketType:
+        """Get a socket, see `ConnectionManager.get_socket`, recording the call."""
+        socket = self._connection_manager.get_socket(host, port, proto, session_id, **kwargs)
+        record = self._connection_manager._record_by_managed_socket[socket]
+        connect_time = None
+        if record.checkouts == 1 and record.connect_time is not None:
+            connect_time = round(record.connect_time * 1000, 1)
+        # arguments like ssl_context and deadline mean nothing offline
+        recorded_kwargs = {
+            name: value
+            for name, value in kwargs.items()
+            if name != "deadline" and (value is None or isinstance(value, (bool, int, float, str)))
+        }
+        self._lease_count += 1
+        self._record(
+            "get",
+            self._lease_count,
+            host,
+            port,
+            proto,
+            session_id,
+            recorded_kwargs,
+            connect_time,
+        )
+        return _RecordingSocket(socket, self, self._lease_count)
+
+    def free_socket(self, socket: _RecordingSocket) -> None:
+        """Free a socket, see `ConnectionManager.free_socket`, recording the call."""
+        self._connection_manager.free_socket(socket._socket)
+        self._record("free", socket._lease)
+
+    def close_socket(self, socket: _RecordingSocket) -> None:
+        """Close a socket, see `ConnectionManager.close_socket`, recording the call."""
+        self._connection_manager.close_socket(socket._socket)
+        self._record("close", socket._lease)
+
+
+def load_recording(path: str) -> List[list]:
+    """
+    Load the events of a recording made with `RecordingConnectionManager`.
+
+    :param str path: the file the recording was written to
+    """
+    with open(path) as recording_file:
+        return [json.loads(line) for line in recording_file if line.strip()]
+
+
+class ReplaySocketPool(SimulatedSocketPool):
+    """
+    A `SimulatedSocketPool` for replaying a recording with `replay`. Sockets only have the
+    data `replay` gives them to read, and unless a ``latency`` is given, connects take one of
+    the recorded connect times.
+
+    :param List[list] events: the recording's events, from `load_recording`
+    :param kwargs: the other `SimulatedSocketPool` arguments
+    """
+
+    def __init__(self, events: List[list], **kwargs) -> None:
+        connect_times = [event[8] / 1000 for event in events if event[1] == "get" and event[8]]
+        if "latency" not in kwargs and connect_times:
+            kwargs["latency"] = {"connect": lambda generator: generator.choice(connect_times)}
+        kwargs.setdefault("response", b"")
+        super().__init__(**kwargs)
+
+
+def replay(
+    connection_manager: ConnectionManager,
+    events: List[list],
+    speed: Optional[float] = 1.0,
+    ssl_context=None,
+) -> dict:
+    """
+    Replay a recording made with `RecordingConnectionManager` against a connection manager,
+    whose socket pool should be a `ReplaySocketPool` for the recording. Calls that fail in the
+    replay are counted, and the rest of the events for that lease are skipped.
+
+    :param ConnectionManager connection_manager: the connection manager to replay against
+    :param List[list] events: the recording's events, from `load_recording`
+    :param Optional[float] speed: how fast to replay: ``1`` waits between events like when they
+      were recorded, ``10`` is ten times as fast and ``None`` doesn't wait at all
+    :param ssl_context: the SSL context for ``https:`` sockets, by default a
+      `SimulatedSSLContext` for the socket pool
+    :return: how many ``gets`` and ``errors`` there were and the ``elapsed`` seconds
+    """
+    if ssl_context is None:
+        ssl_context = SimulatedSSLContext(connection_manager._socket_pool)
+    socket_by_lease = {}
+    gets = 0
+    errors = 0
+    start = time.monotonic()
+    for event in events:
+        if speed:
+            delay = start + event[0] / 1000 / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+        action = event[1]
+        lease = event[2]
+        if action != "get" and lease not in socket_by_lease:
+            # the get failed
+            continue
+        try:
+            if action == "get":
+                gets += 1
+                socket_by_lease[lease] = connection_manager.get_socket(
+                    event[3], event[4], event[5], event[6], ssl_context=ssl_context, **event[7]
+                )
+            elif action == "send":
+                socket_by_lease[lease].send(_decode(event[3]))
+            elif action == "recv":
+                data = _decode(event[3])
+                socket = socket_by_lease[lease]
+                socket._queue(data)
+                socket.recv_into(bytearray(len(data)))
+            elif action == "free":
+                connection_manager.free_socket(socket_by_lease.pop(lease))
+            elif action == "close":
+                connection_manager.close_socket(socket_by_lease.pop(lease))
+        except (MemoryError, OSError, RuntimeError):
+            errors += 1
+            socket = socket_by_lease.pop(lease, None)
+            if socket is not None and action not in {"free", "close"}:
+                connection_manager.close_socket(socket)
+
+    return {"gets": gets, "errors": errors, "elapsed": time.monotonic() - start}
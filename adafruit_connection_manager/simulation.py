@@ -0,0 +1,303 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.simulation`
+================================================================================
+
+A simulated socket pool with latency and faults, for testing and benchmarking how sockets are
+managed without a radio or network
+
+* Author(s): Justin Myers
+"""
+
+import errno
+import random
+import sys
+import time
+
+try:
+    from threading import Lock
+except ImportError:
+    Lock = None
+
+if not sys.implementation.name == "circuitpython":
+    from typing import Optional, Tuple
+
+
+class _NoLock:
+    """Stands in for a `threading.Lock` where there are no threads."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class SimulatedSocket:
+    """A socket from a `SimulatedSocketPool`, see `SimulatedSocketPool` for how it behaves."""
+
+    def __init__(self, socket_pool: "SimulatedSocketPool", family: int, socket_type: int) -> None:
+        self._socket_pool = socket_pool
+        self.family = family
+        self.type = socket_type
+        self._timeout = None
+        self._is_ssl = False
+        self._closed = False
+        self._buffer = b""
+        self.options = {}
+        self.sent_data = []
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        """Set the timeout for connecting and reading."""
+        self._timeout = timeout
+
+    def setsockopt(self, level: int, option: int, value: int) -> None:
+        """Record a socket option, see ``options``."""
+        self.options[(level, option)] = value
+
+    def _queue(self, data: bytes) -> None:
+        """Queue data from the simulated server to be read."""
+        self._buffer += data
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise OSError(errno.EBADF, "Socket is closed")
+
+    def connect(self, address: Tuple[str, int], mode: Optional[int] = None) -> None:
+        """Connect after the simulated connect latency, and TLS latency for SSL sockets."""
+        self._check_open()
+        socket_pool = self._socket_pool
+        latency = socket_pool._sample("connect")
+        if self._is_ssl or mode is not None:
+            latency += socket_pool._sample("tls")
+        socket_pool._wait(latency, self._timeout)
+        socket_pool._maybe_reset(self)
+        with socket_pool._lock:
+            socket_pool.stats["connects"] += 1
+
+    def send(self, data: bytes) -> int:
+        """Send after the simulated send latency, queueing the pool's response to read."""
+        self._check_open()
+        socket_pool = self._socket_pool
+        socket_pool._wait(socket_pool._sample("send"), self._timeout)
+        socket_pool._maybe_reset(self)
+        self.sent_data.append(bytes(data))
+        self._queue(socket_pool._response)
+        with socket_pool._lock:
+            socket_pool.stats["bytes_sent"] += len(data)
+        return len(data)
+
+    def recv_into(self, buffer: bytearray, nbytes: int = 0) -> int:
+        """Read the queued response after the simulated recv latency."""
+        self._check_open()
+        socket_pool = self._socket_pool
+        if not self._buffer:
+            # nothing more will come, so wait out the timeout
+            socket_pool._wait(self._timeout or 0, None)
+            raise OSError(errno.ETIMEDOUT, "timed out")
+        socket_pool._wait(socket_pool._sample("recv"), self._timeout)
+        socket_pool._maybe_reset(self)
+        size = min(nbytes or len(buffer), len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        with socket_pool._lock:
+            socket_pool.stats["bytes_received"] += size
+        return size
+
+    def recv(self, bufsize: int) -> bytes:
+        """Read the queued response after the simulated recv latency."""
+        buffer = bytearray(bufsize)
+        size = self.recv_into(buffer)
+        return bytes(buffer[:size])
+
+    def close(self) -> None:
+        """Close the socket, freeing its place in the pool."""
+        if self._closed:
+            return
+        self._closed = True
+        with self._socket_pool._lock:
+            self._socket_pool._open_socket_count -= 1
+            self._socket_pool.stats["closes"] += 1
+
+
+class SimulatedSSLContext:
+    """An SSL context for a `SimulatedSocketPool`, adding the TLS latency to connects."""
+
+    def __init__(self, socket_pool: "SimulatedSocketPool") -> None:
+        self._socket_pool = socket_pool
+
+    def wrap_socket(
+        self, socket: SimulatedSocket, server_hostname: Optional[str] = None
+    ) -> SimulatedSocket:
+        """Mark the socket as SSL and return it."""
+        socket._is_ssl = True
+        socket.server_hostname = server_hostname
+        return socket
+
+
+class SimulatedSocketPool:
+    """
+    A socket pool that simulates the latency and faults of a real network, for testing and
+    benchmarking how a `ConnectionManager` pools, evicts and retries sockets.
+
+    Each operation takes a random time drawn from its latency distribution. A latency is
+    either a fixed number of seconds, a tuple naming a distribution: ``("uniform", low,
+    high)``, ``("normal", mean, stddev)``, ``("lognormal", mu, sigma)`` or ``("exponential",
+    mean)``, or a function given a `random.Random` returning seconds. Operations that take
+    longer than the socket's timeout raise ``OSError`` with ``ETIMEDOUT`` once it passes.
+
+    Sockets queue ``response`` to read after each ``send``, and reading with nothing queued
+    times out. Runs with the same ``seed`` and calls give the same latencies and faults.
+
+    Needs the `random` module's ``Random`` class, so use it with CPython.
+
+    :param Optional[int] seed: the seed for the latencies and faults
+    :param Optional[dict] latency: the latency for each operation: ``"dns"`` for
+      ``getaddrinfo``, ``"connect"``, ``"tls"`` (added to SSL connects), ``"send"`` and
+      ``"recv"``; missing ones take no time
+    :param Optional[int] max_sockets: the most sockets open at once, like a radio's limit;
+      ``socket`` raises ``out_of_sockets_error`` past it
+    :param type out_of_sockets_error: the exception raised when out of sockets: ``MemoryError``
+      (like the ESP32SPI) or ``OSError`` (raised with ``ENOMEM``)
+    :param float reset_rate: the chance, from 0 to 1, that a connect, send or recv fails with
+      ``OSError`` ``ECONNRESET``
+    :param float time_scale: how fast the simulated time passes: ``1`` sleeps for the whole
+      latency, ``0.1`` for a tenth of it and ``0`` doesn't sleep at all; the ``elapsed`` stat
+      always has the simulated time
+    :param bytes response: what the simulated server responds to each ``send`` with
+    """
+
+    AF_INET = 2
+    AF_INET6 = 10
+    SOCK_STREAM = 1
+    SOCK_DGRAM = 2
+    SOL_SOCKET = 1
+    SO_KEEPALIVE = 9
+    SO_RCVBUF = 8
+    SO_SNDBUF = 7
+    IPPROTO_TCP = 6
+    TCP_NODELAY = 1
+
+    def __init__(
+        self,
+        *,
+        seed: Optional[int] = None,
+        latency: Optional[dict] = None,
+        max_sockets: Optional[int] = None,
+        out_of_sockets_error: type = MemoryError,
+        reset_rate: float = 0.0,
+        time_scale: float = 1.0,
+        response: bytes = b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n",
+    ) -> None:
+        self._random = random.Random(seed)
+        self._latency = latency or {}
+        for operation in self._latency:
+            if operation not in {"dns", "connect", "tls", "send", "recv"}:
+                raise ValueError(f"Unsupported operation: {operation}")
+        self._max_sockets = max_sockets
+        self._out_of_sockets_error = out_of_sockets_error
+        self._reset_rate = reset_rate
+        self._time_scale = time_scale
+        self._response = response
+        self._lock = _NoLock() if Lock is None else Lock()
+        self._open_socket_count = 0
+        self._addresses = {}
+        self.stats = {
+            "lookups": 0,
+            "sockets": 0,
+            "max_open_sockets": 0,
+            "out_of_sockets": 0,
+            "connects": 0,
+            "resets": 0,
+            "timeouts": 0,
+            "closes": 0,
+            "bytes_sent": 0,
+            "bytes_received": 0,
+            "elapsed": 0.0,
+        }
+
+    @property
+    def open_socket_count(self) -> int:
+        """Get the count of sockets created and not closed yet."""
+        return self._open_socket_count
+
+    def _sample(self, operation: str) -> float:
+        """Draw a latency for the operation from its distribution."""
+        spec = self._latency.get(operation)
+        if not spec:
+            return 0.0
+        if not isinstance(spec, tuple) and not callable(spec):
+            return float(spec)
+        with self._lock:
+            if callable(spec):
+                latency = spec(self._random)
+            elif spec[0] == "uniform":
+                latency = self._random.uniform(spec[1], spec[2])
+            elif spec[0] == "normal":
+                latency = self._random.gauss(spec[1], spec[2])
+            elif spec[0] == "lognormal":
+                latency = self._random.lognormvariate(spec[1], spec[2])
+            elif spec[0] == "exponential":
+                latency = self._random.expovariate(1 / spec[1])
+            else:
+                raise ValueError(f"Unsupported latency distribution: {spec[0]}")
+        return max(latency, 0.0)
+
+    def _wait(self, latency: float, timeout: Optional[float]) -> None:
+        """Let the latency pass, raising if it's longer than the timeout."""
+        timed_out = timeout is not None and latency > timeout
+        if timed_out:
+            latency = timeout
+        with self._lock:
+            self.stats["elapsed"] += latency
+            if timed_out:
+                self.stats["timeouts"] += 1
+        if latency and self._time_scale:
+            time.sleep(latency * self._time_scale)
+        if timed_out:
+            raise OSError(errno.ETIMEDOUT, "timed out")
+
+    def _maybe_reset(self, socket: SimulatedSocket) -> None:
+        """Reset the socket's connection, at the ``reset_rate``."""
+        if not self._reset_rate:
+            return
+        with self._lock:
+            reset = self._random.random() < self._reset_rate
+            if reset:
+                self.stats["resets"] += 1
+        if reset:
+            socket._buffer = b""
+            raise OSError(errno.ECONNRESET, "Connection reset by peer")
+
+    def getaddrinfo(
+        self, host: str, port: int, family: int = 0, socket_type: int = 0, *args
+    ) -> list:
+        """Look up a made up address for the host, after the simulated DNS latency."""
+        self._wait(self._sample("dns"), None)
+        with self._lock:
+            self.stats["lookups"] += 1
+            address = self._addresses.get(host)
+            if address is None:
+                count = len(self._addresses) + 1
+                address = f"10.0.{count // 256}.{count % 256}"
+                self._addresses[host] = address
+        return [(self.AF_INET, socket_type or self.SOCK_STREAM, 0, "", (address, port))]
+
+    def socket(
+        self, family: int = AF_INET, socket_type: int = SOCK_STREAM, *args
+    ) -> SimulatedSocket:
+        """Create a socket, if there's room for another."""
+        with self._lock:
+            if self._max_sockets is not None and self._open_socket_count >= self._max_sockets:
+                self.stats["out_of_sockets"] += 1
+                if issubclass(self._out_of_sockets_error, OSError):
+                    raise self._out_of_sockets_error(errno.ENOMEM, "Out of sockets")
+                raise self._out_of_sockets_error("Out of sockets")
+            self._open_socket_count += 1
+            self.stats["sockets"] += 1
+            self.stats["max_open_sockets"] = max(
+                self.stats["max_open_sockets"], self._open_socket_count
+            )
+        return SimulatedSocket(self, family, socket_type)
@@ -0,0 +1,74 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.stats`
+================================================================================
+
+Snapshots of the managed sockets, the waits for them and hedging
+
+* Author(s): Justin Myers
+"""
+
+import sys
+
+if not sys.implementation.name == "circuitpython":
+    from typing import List
+
+    from adafruit_connection_manager import ConnectionManager
+
+
+def get_connections(connection_manager: ConnectionManager) -> List[dict]:
+    """See `ConnectionManager.connections`"""
+    with connection_manager._condition:
+        connections = []
+        for socket, record in connection_manager._record_by_managed_socket.items():
+            if record.generation != connection_manager._generation:
+                state = "stale"
+            elif socket in connection_manager._available_sockets:
+                state = "available"
+            else:
+                state = "in use"
+            host, port, proto, session_id = record.key[:4]
+            connections.append(
+                {
+                    "key": record.key,
+                    "host": host,
+                    "port": port,
+                    "proto": proto,
+                    "session_id": session_id,
+                    "proxy": record.key[4] if len(record.key) > 4 else None,
+                    "state": state,
+                    "priority": record.priority,
+                    "created": record.created,
+                    "last_used": record.last_used,
+                    "checkouts": record.checkouts,
+                    "connect_time": record.connect_time,
+                    "bytes_sent": record.bytes_sent,
+                    "bytes_received": record.bytes_received,
+                }
+            )
+        return connections
+
+
+def get_wait_stats(connection_manager: ConnectionManager) -> dict:
+    """See `ConnectionManager.wait_stats`"""
+    return {
+        "waiting": len(connection_manager._waiters),
+        "waits": connection_manager._wait_count,
+        "timeouts": connection_manager._wait_timeout_count,
+        "total_wait_time": connection_manager._total_wait_time,
+        "max_wait_time": connection_manager._max_wait_time,
+    }
+
+
+def get_hedge_stats(connection_manager: ConnectionManager) -> dict:
+    """See `ConnectionManager.hedge_stats`"""
+    hedging = connection_manager._hedging
+    if hedging is None:
+        return {"connects": 0, "hedges": 0, "won": 0}
+    return {
+        "connects": hedging.connect_count,
+        "hedges": hedging.hedge_count,
+        "won": hedging.win_count,
+    }
@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+"""
+`adafruit_connection_manager.wait`
+================================================================================
+
+Waiting on several managed sockets at once
+
+* Author(s): Justin Myers
+"""
+
+import sys
+import time
+
+if not sys.implementation.name == "circuitpython":
+    from typing import List, Optional
+
+    from circuitpython_typing.socket import SocketType
+
+    from adafruit_connection_manager import ConnectionManager
+
+
+def _has_data(socket: SocketType) -> Optional[bool]:
+    """Check if a socket has data buffered or available, ``None`` if it can't tell."""
+    pending = getattr(socket, "pending", None)
+    if pending is not None and pending():
+        # SSL sockets can hold decrypted data that select won't see
+        return True
+    available = getattr(getattr(socket, "_socket", socket), "_available", None)
+    if available is not None:
+        # software socketpools (like the esp32spi) report the bytes they have waiting
+        return bool(available())
+    if pending is not None:
+        return False
+    return None
+
+
+def wait_readable(
+    connection_manager: ConnectionManager,
+    sockets: List[SocketType],
+    timeout: Optional[float] = None,
+) -> List[SocketType]:
+    """See `ConnectionManager.wait_readable`"""
+    for socket in sockets:
+        if socket not in connection_manager._record_by_managed_socket:
+            raise RuntimeError("Socket not managed")
+
+    # sockets with buffered data are ready now
+    ready = [socket for socket in sockets if _has_data(socket)]
+    if ready or not sockets:
+        return ready
+
+    try:
+        import select
+    except ImportError:
+        select = None
+
+    if hasattr(select, "poll"):
+        poller = select.poll()
+        socket_by_entry = {}
+        try:
+            for socket in sockets:
+                poller.register(socket, select.POLLIN)
+                entry = socket.fileno() if hasattr(socket, "fileno") else socket
+                socket_by_entry[entry] = socket
+        except (AttributeError, OSError, TypeError, ValueError):
+            # these sockets can't be polled, fallback to checking them
+            pass
+        else:
+            wait_ms = -1 if timeout is None else int(timeout * 1000)
+            return [socket_by_entry[entry[0]] for entry in poller.poll(wait_ms)]
+
+    elif select is not None:
+        try:
+            return select.select(sockets, [], [], timeout)[0]
+        except (AttributeError, OSError, TypeError, ValueError):
+            # these sockets can't be selected, fallback to checking them
+            pass
+
+    end = None if timeout is None else time.monotonic() + timeout
+    while True:
+        ready = [socket for socket in sockets if _has_data(socket) is not False]
+        if ready or (end is not None and time.monotonic() >= end):
+            return ready
+        time.sleep(0.01)
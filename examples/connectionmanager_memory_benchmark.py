@@ -0,0 +1,144 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+# Measures the heap used per connection by the ConnectionManager, using stand-in sockets so
+# no network is needed. Runs on CircuitPython (with gc.mem_alloc) and CPython (with tracemalloc).
+#
+# For fake SSL, it compares the wrapper as it was before __slots__ and method pass-throughs
+# ("before") with the current one ("after").
+
+import gc
+
+import adafruit_connection_manager
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+CONNECTIONS = 50
+
+
+class BenchmarkSocket:
+    def settimeout(self, value):
+        pass
+
+    def connect(self, address, mode=None):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, data):
+        return len(data)
+
+    def recv(self, count):
+        return b""
+
+    def recv_into(self, buffer, nbytes=0):
+        return 0
+
+
+class BenchmarkPool:
+    SOCK_STREAM = 1
+
+    def getaddrinfo(self, host, port, family=0, socktype=0):
+        return ((2, 1, 0, "", ("10.0.0.1", port)),)
+
+    def socket(self, family, socktype):
+        return BenchmarkSocket()
+
+
+class BenchmarkRadio:
+    TLS_MODE = 2
+
+
+class LegacyFakeSSLSocket:
+    # the wrapper before __slots__, binding the socket's methods onto each one
+    def __init__(self, socket, tls_mode):
+        self._socket = socket
+        self._mode = tls_mode
+        self.settimeout = socket.settimeout
+        self.send = socket.send
+        self.recv = socket.recv
+        self.close = socket.close
+        self.recv_into = socket.recv_into
+        self._interface = getattr(socket, "_interface", None)
+        self._socket_pool = getattr(socket, "_socket_pool", None)
+
+    def connect(self, address):
+        return self._socket.connect(address, self._mode)
+
+
+class LegacyFakeSSLContext:
+    def __init__(self, iface):
+        self._iface = iface
+
+    def wrap_socket(self, socket, server_hostname=None):
+        return LegacyFakeSSLSocket(socket, self._iface.TLS_MODE)
+
+
+def heap_used():
+    gc.collect()
+    if tracemalloc is not None:
+        return tracemalloc.get_traced_memory()[0]
+    return gc.mem_alloc()
+
+
+def held_per_connection(connection_manager, proto, ssl_context):
+    """The heap each open connection holds, measured with all of them open at once."""
+    start = heap_used()
+    sockets = [
+        connection_manager.get_socket("localhost", 443, proto, i, ssl_context=ssl_context)
+        for i in range(CONNECTIONS)
+    ]
+    used = heap_used() - start
+    for socket in sockets:
+        connection_manager.close_socket(socket)
+    return used // CONNECTIONS
+
+
+def allocated_per_connection(connection_manager, proto, ssl_context):
+    """The heap allocated to connect and close a socket, ``None`` if it can't be measured."""
+    if tracemalloc is not None:
+        # CPython frees each connection's objects right away, so only what's held can be seen
+        return None
+    gc.collect()
+    gc.disable()
+    start = gc.mem_alloc()
+    for _ in range(CONNECTIONS):
+        socket = connection_manager.get_socket("localhost", 443, proto, ssl_context=ssl_context)
+        connection_manager.close_socket(socket)
+    used = gc.mem_alloc() - start
+    gc.enable()
+    return used // CONNECTIONS
+
+
+def benchmark(name, proto, ssl_context=None):
+    connection_manager = adafruit_connection_manager.ConnectionManager(BenchmarkPool())
+
+    # warm up, so one time allocations aren't counted
+    socket = connection_manager.get_socket("localhost", 443, proto, ssl_context=ssl_context)
+    connection_manager.close_socket(socket)
+
+    held = held_per_connection(connection_manager, proto, ssl_context)
+    allocated = allocated_per_connection(connection_manager, proto, ssl_context)
+    result = f"{name}: {held} bytes held per open connection"
+    if allocated is not None:
+        result += f", {allocated} bytes allocated per connect and close"
+    print(result)
+
+
+if tracemalloc is not None:
+    tracemalloc.start()
+
+pool = BenchmarkPool()
+radio = BenchmarkRadio()
+benchmark("http", "http:")
+benchmark("https (fake SSL, before)", "https:", LegacyFakeSSLContext(radio))
+benchmark(
+    "https (fake SSL, after)",
+    "https:",
+    adafruit_connection_manager.create_fake_ssl_context(pool, radio),
+)
@@ -0,0 +1,48 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+# Measures the time and RAM used to import the library and each part of it loaded on first use.
+# Runs on CircuitPython (with gc.mem_alloc) and CPython (with tracemalloc). Copy the .py or the
+# .mpy version of the library to the board to compare them.
+
+import gc
+import sys
+import time
+
+try:
+    import tracemalloc
+
+    tracemalloc.start()
+
+    def get_used():
+        return tracemalloc.get_traced_memory()[0]
+
+    def get_time_ms():
+        return time.perf_counter() * 1000
+
+except ImportError:
+
+    def get_used():
+        return gc.mem_alloc()
+
+    def get_time_ms():
+        return time.monotonic_ns() / 1000000
+
+
+def measure(name):
+    gc.collect()
+    used = get_used()
+    start = get_time_ms()
+    __import__(name)
+    duration = get_time_ms() - start
+    gc.collect()
+    used = get_used() - used
+    module = sys.modules[name]
+    form = getattr(module, "__file__", "frozen").rsplit(".", 1)[-1]
+    print(f"{name} ({form}): {duration:.1f}ms, {used} bytes")
+
+
+measure("adafruit_connection_manager")
+for extra in ("radio", "fake_ssl", "batch", "wait", "multi", "maintain", "hosts", "drain", "stats"):
+    measure("adafruit_connection_manager." + extra)
@@ -0,0 +1,109 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Configure Origin Tests"""
+
+import time
+from unittest import mock
+
+import mocket
+
+import adafruit_connection_manager
+
+
+def test_max_uses():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, max_uses=2)
+
+    # reused once
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_1
+
+    # then closed when freed
+    connection_manager.free_socket(socket)
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 0
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+
+
+def test_max_age():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, max_age=60)
+
+    with mock.patch("time.monotonic", return_value=100):
+        socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+        connection_manager.free_socket(socket)
+    assert connection_manager.available_socket_count == 1
+
+    # it got too old while idle, so it's replaced
+    with mock.patch("time.monotonic", return_value=160):
+        socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+    mock_socket_1.close.assert_called_once()
+
+    # and closed when freed once too old
+    with mock.patch("time.monotonic", return_value=220):
+        connection_manager.free_socket(socket)
+    mock_socket_2.close.assert_called_once()
+
+
+def test_other_origins_not_limited():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, max_uses=1)
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    connection_manager.free_socket(socket)
+    assert connection_manager.available_socket_count == 1
+
+
+def test_preopen():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, max_uses=1, preopen=True)
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", read_timeout=5)
+    connection_manager.free_socket(socket)
+    mock_socket_1.close.assert_called_once()
+
+    # the replacement is connected in the background
+    for _ in range(500):
+        if connection_manager.available_socket_count:
+            break
+        time.sleep(0.01)
+    assert connection_manager.available_socket_count == 1
+    mock_socket_2.settimeout.assert_called_with(5)
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+    assert connection_manager.connections()[0]["checkouts"] == 1
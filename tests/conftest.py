@@ -94,3 +94,23 @@ def reset_connection_manager(monkeypatch):
         "adafruit_connection_manager._global_ssl_contexts",
         {},
     )
+    monkeypatch.setattr(
+        "adafruit_connection_manager._global_key_by_socketpool",
+        {},
+    )
+    monkeypatch.setattr(
+        "adafruit_connection_manager._global_weakref",
+        None,
+    )
+    monkeypatch.setattr(
+        "adafruit_connection_manager._global_max_socketpools",
+        None,
+    )
+    monkeypatch.setattr(
+        "adafruit_connection_manager._global_socketpool_keys",
+        [],
+    )
+    monkeypatch.setattr(
+        "adafruit_connection_manager._global_busy_connection_managers",
+        set(),
+    )
@@ -4,6 +4,8 @@
 
 """Get Connection Manager Tests"""
 
+import threading
+
 import mocket
 import pytest
 
@@ -143,3 +145,53 @@ def test_connection_manager_close_all_single_release_references_true(
 
     assert socket_pool_wifi not in adafruit_connection_manager._global_connection_managers.keys()
     assert socket_pool_esp in adafruit_connection_manager._global_connection_managers.keys()
+
+
+def test_connection_manager_close_all_drain():
+    mock_pool_1 = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool_1.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.get_connection_manager(mock_pool_1)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # the socket in use is given back before it's closed
+    freed = []
+    threading.Timer(0.05, lambda: freed.append(connection_manager.free_socket(socket))).start()
+    adafruit_connection_manager.connection_manager_close_all(mock_pool_1, drain_timeout=2)
+    assert freed
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 0
+
+    # done draining
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # not given back in time, so it's closed anyway
+    adafruit_connection_manager.connection_manager_close_all(mock_pool_1, drain_timeout=0.05)
+    mock_socket_2.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 0
+
+
+def test_connection_manager_close_all_concurrent():
+    mock_pool_1 = mocket.MocketPool()
+    mock_pool_1.__name__ = "socket"
+    close_threads = []
+    mock_sockets = []
+    for _ in range(3):
+        mock_socket = mocket.Mocket()
+        mock_socket.close.side_effect = lambda: close_threads.append(threading.get_ident())
+        mock_sockets.append(mock_socket)
+    mock_pool_1.socket.side_effect = mock_sockets
+
+    connection_manager = adafruit_connection_manager.get_connection_manager(mock_pool_1)
+    for session_id in range(3):
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", session_id)
+
+    adafruit_connection_manager.connection_manager_close_all(mock_pool_1)
+    assert connection_manager.managed_socket_count == 0
+    assert len(close_threads) == 3
+    assert threading.get_ident() not in close_threads
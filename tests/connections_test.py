@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Connections Tests"""
+
+from unittest import mock
+
+import mocket
+
+import adafruit_connection_manager
+
+
+def test_connections():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    assert connection_manager.connections() == []
+
+    with mock.patch("time.monotonic", return_value=10):
+        socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+        connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", session_id=1)
+    with mock.patch("time.monotonic", return_value=20):
+        connection_manager.free_socket(socket)
+    with mock.patch("time.monotonic", return_value=30):
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+        connection_manager.free_socket(socket)
+
+    connection_1, connection_2 = sorted(
+        connection_manager.connections(), key=lambda connection: connection["host"]
+    )
+    assert connection_1["key"] == (mocket.MOCK_HOST_1, 80, "http:", None)
+    assert connection_1["state"] == "available"
+    assert connection_1["checkouts"] == 2
+    assert connection_1["created"] == 10
+    assert connection_1["last_used"] == 30
+    assert connection_1["connect_time"] == 0
+    assert connection_2["session_id"] == "1"
+    assert connection_2["state"] == "in use"
+    assert connection_2["checkouts"] == 1
+
+    connection_manager.network_changed()
+    assert {connection["state"] for connection in connection_manager.connections()} == {"stale"}
+
+
+def test_connections_meter_sockets():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, meter_sockets=True
+    )
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket is not mock_socket_1
+
+    socket.send(b"GET / HTTP/1.1\r\n\r\n")
+    assert socket.recv(10) == mocket.MOCK_RESPONSE[:10]
+    buffer = bytearray(5)
+    assert socket.recv_into(buffer) == 5
+
+    (connection,) = connection_manager.connections()
+    assert connection["bytes_sent"] == 18
+    assert connection["bytes_received"] == 15
+
+    # the wrapper is what's managed
+    connection_manager.free_socket(socket)
+    assert connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:") is socket
+    connection_manager.close_socket(socket)
+    mock_socket_1.close.assert_called_once()
@@ -0,0 +1,107 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Drain Tests"""
+
+import threading
+import time
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+def test_drain():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    connection_manager.free_socket(socket_1)
+
+    # idle sockets are closed right away, and the ones in use are waited for
+    threading.Timer(0.05, connection_manager.free_socket, (socket_2,)).start()
+    assert connection_manager.drain(2)
+    mock_socket_1.close.assert_called_once()
+    mock_socket_2.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 0
+
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert "Connection manager is draining" in str(context)
+
+
+def test_drain_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    assert not connection_manager.drain(0.05)
+    mock_socket_1.close.assert_not_called()
+
+    # given back after the drain timed out, it's still closed
+    connection_manager.free_socket(socket)
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.drain(0)
+
+
+def test_drain_wakes_waiters():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    errors = []
+
+    def wait_for_socket():
+        try:
+            connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", wait_timeout=2)
+        except RuntimeError as error:
+            errors.append(error)
+
+    waiting = threading.Thread(target=wait_for_socket)
+    waiting.start()
+    while not connection_manager.waiting_count:
+        time.sleep(0.01)
+
+    assert not connection_manager.drain(0)
+    waiting.join()
+    assert "Connection manager is draining" in str(errors[0])
+    assert connection_manager._reserved_socket_count == 0
+
+    connection_manager.free_socket(socket)
+    assert connection_manager.managed_socket_count == 0
+
+
+def test_drain_resume():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert not connection_manager.drain(0)
+
+    # resumed, new sockets are handed out and the one from before is closed once given back
+    connection_manager.resume()
+    assert connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:") == mock_socket_2
+    connection_manager.free_socket(socket)
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 1
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Fork Tests"""
+
+import os
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+def test_reset_after_fork():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+    connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+
+    # the inherited sockets are forgotten, not closed
+    adafruit_connection_manager._reset_after_fork()
+    assert connection_manager.managed_socket_count == 0
+    assert connection_manager.available_socket_count == 0
+    mock_socket_1.close.assert_not_called()
+    mock_socket_2.close.assert_not_called()
+
+    # and new ones are connected
+    mock_pool.socket.side_effect = [mocket.Mocket()]
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket not in {mock_socket_1, mock_socket_2}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_fork():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.get_connection_manager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, str(connection_manager.managed_socket_count).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    child_socket_count = os.read(read_fd, 10)
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    assert child_socket_count == b"0"
+    assert connection_manager.managed_socket_count == 1
@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Get Datagram Socket Tests"""
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+class DatagramPool(mocket.MocketPool):
+    AF_INET = 2
+    SOCK_DGRAM = 2
+
+    def __init__(self, radio=None):
+        super().__init__(radio)
+        self.getaddrinfo.return_value = ((self.AF_INET, 0, 0, "", (mocket.MOCK_POOL_IP, 123)),)
+
+
+def test_get_datagram_socket():
+    mock_pool = DatagramPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    socket = connection_manager.get_datagram_socket(mocket.MOCK_HOST_1, 123, timeout=2)
+    assert socket == mock_socket_1
+    mock_pool.getaddrinfo.assert_called_once_with(mocket.MOCK_HOST_1, 123, 0, 2)
+    mock_pool.socket.assert_called_once_with(2, 2)
+    mock_socket_1.connect.assert_called_once_with((mocket.MOCK_POOL_IP, 123))
+    mock_socket_1.settimeout.assert_called_once_with(2)
+
+    # freed datagram sockets are reused for the same host and port
+    connection_manager.free_socket(socket)
+    assert connection_manager.get_datagram_socket(mocket.MOCK_HOST_1, 123) == mock_socket_1
+
+    # and are kept apart from stream sockets
+    assert connection_manager.get_socket(mocket.MOCK_HOST_1, 123, "http:") == mock_socket_2
+    assert connection_manager.managed_socket_count == 2
+
+
+def test_get_datagram_socket_max_sockets():
+    mock_pool = DatagramPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # datagram sockets share the socket budget
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.get_datagram_socket(mocket.MOCK_HOST_1, 123)
+    assert "Maximum number of sockets reached" in str(context)
+
+    connection_manager.free_socket(socket)
+    assert connection_manager.get_datagram_socket(mocket.MOCK_HOST_1, 123) == mock_socket_2
+
+
+def test_get_datagram_socket_not_supported():
+    connection_manager = adafruit_connection_manager.ConnectionManager(mocket.MocketPool())
+
+    with pytest.raises(ValueError) as context:
+        connection_manager.get_datagram_socket(mocket.MOCK_HOST_1, 123)
+    assert "does not support UDP" in str(context)
@@ -4,6 +4,7 @@
 
 """Get Socket Tests"""
 
+import socket as socket_module
 from unittest import mock
 
 import mocket
@@ -248,3 +249,327 @@ def test_fake_ssl_context_connect_error(
         connection_manager.get_socket(mocket.MOCK_HOST_1, 443, "https:", ssl_context=ssl_context)
     assert "12" in str(context)
     assert "RuntimeError 1" in str(context)
+
+
+def test_get_socket_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # a single timeout is used for both connect and read
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", timeout=2)
+    mock_socket_1.settimeout.assert_called_once_with(2)
+
+
+def test_get_socket_split_timeouts():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    mock_ssl_context = mocket.SSLContext()
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # the TLS timeout is added to the connect timeout, then the read timeout is set
+    connection_manager.get_socket(
+        mocket.MOCK_HOST_1,
+        443,
+        "https:",
+        ssl_context=mock_ssl_context,
+        connect_timeout=1,
+        tls_timeout=3,
+        read_timeout=30,
+    )
+    assert mock_socket_1.settimeout.call_args_list == [mock.call(4), mock.call(30)]
+
+
+def test_get_socket_deadline():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # the connect timeout is bounded by the deadline
+    with mock.patch("time.monotonic", return_value=100):
+        connection_manager.get_socket(
+            mocket.MOCK_HOST_1, 80, "http:", connect_timeout=5, read_timeout=10, deadline=101.5
+        )
+    assert mock_socket_1.settimeout.call_args_list == [mock.call(1.5), mock.call(10)]
+
+
+def test_get_socket_deadline_passed():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    free_sockets_mock = mock.Mock()
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager._free_sockets = free_sockets_mock
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    # no lookup is done, no socket is created and nothing is freed once the deadline has passed
+    with mock.patch("time.monotonic", return_value=100):
+        with pytest.raises(OSError) as context:
+            connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", deadline=99)
+    assert "Deadline exceeded" in str(context)
+    assert mock_pool.getaddrinfo.call_count == 1
+    assert mock_pool.socket.call_count == 1
+    free_sockets_mock.assert_not_called()
+
+
+def test_get_socket_max_sockets():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+
+    # get a socket to fill the manager
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_1
+
+    # no more sockets while it's in use
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert "Maximum number of sockets reached" in str(context)
+
+    # once freed, it gets closed to make room
+    connection_manager.free_socket(socket)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket == mock_socket_2
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 1
+
+
+def test_get_socket_auto_session():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # two sockets to the same host without picking session IDs
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True)
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True)
+    assert socket_1 == mock_socket_1
+    assert socket_2 == mock_socket_2
+
+    # the freed socket is the one reused
+    connection_manager.free_socket(socket_2)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True)
+    assert socket == mock_socket_2
+    assert connection_manager.managed_socket_count == 2
+
+
+def test_get_socket_auto_session_max_sockets_per_origin():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, max_sockets_per_origin=1
+    )
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True)
+    assert socket == mock_socket_1
+
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True)
+    assert "All 1 sockets are already connected" in str(context)
+
+    # other hosts have their own slots
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", auto_session=True)
+    assert socket == mock_socket_2
+
+
+def test_get_socket_adaptive_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # nothing seen yet, so the given timeout is used
+    with mock.patch("time.monotonic", side_effect=[10, 10.1, 10.1]):
+        connection_manager.get_socket(
+            mocket.MOCK_HOST_1, 80, "http:", session_id="1", adaptive_timeout=True
+        )
+    mock_socket_1.settimeout.assert_called_once_with(1.0)
+    connect_time = connection_manager._connect_time_by_origin[(mocket.MOCK_HOST_1, 80)]
+    assert connect_time == pytest.approx([0.1, 0.05])
+
+    # the next connect is bounded by what has been seen
+    with mock.patch("time.monotonic", side_effect=[20, 20.1, 20.1]):
+        connection_manager.get_socket(
+            mocket.MOCK_HOST_1, 80, "http:", session_id="2", adaptive_timeout=True, read_timeout=5
+        )
+    assert mock_socket_2.settimeout.call_args_list[0][0][0] == pytest.approx(0.3)
+    assert mock_socket_2.settimeout.call_args_list[1] == mock.call(5)
+
+    # but never below the minimum
+    connection_manager._connect_time_by_origin[(mocket.MOCK_HOST_1, 80)] = [0.01, 0.001]
+    connection_manager.get_socket(
+        mocket.MOCK_HOST_1, 80, "http:", session_id="3", adaptive_timeout=True, read_timeout=5
+    )
+    assert mock_socket_3.settimeout.call_args_list[0] == mock.call(0.2)
+
+
+def test_get_socket_adaptive_timeout_backs_off():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_1.connect.side_effect = OSError("timed out")
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager._connect_time_by_origin[(mocket.MOCK_HOST_1, 80)] = [0.1, 0.05]
+
+    # a timed out connect counts as a slow sample
+    with mock.patch("time.monotonic", side_effect=[10, 10.5]):
+        with pytest.raises(OSError):
+            connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", adaptive_timeout=True)
+    connect_time = connection_manager._connect_time_by_origin[(mocket.MOCK_HOST_1, 80)]
+    assert connect_time[0] > 0.1
+
+
+def test_get_socket_priority():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=2)
+
+    # an important socket and a background one, both idle
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", priority=1)
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    connection_manager.free_socket(socket_1)
+    connection_manager.free_socket(socket_2)
+
+    # background traffic only evicts the background socket
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 443, "http:")
+    assert socket == mock_socket_3
+    mock_socket_1.close.assert_not_called()
+    mock_socket_2.close.assert_called_once()
+
+    # and can't get a socket once only more important ones are left idle
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_2, 443, "http:")
+    assert "Maximum number of sockets reached" in str(context)
+    assert connection_manager.available_socket_count == 1
+
+
+def test_get_socket_priority_evicts_lower():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    # an important request takes the idle background socket's place
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", priority=1)
+    assert socket == mock_socket_2
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager._record_by_managed_socket[socket].priority == 1
+
+
+def test_get_socket_numeric_ip():
+    mock_pool = mocket.MocketPool()
+    mock_pool.AF_INET = 2
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # nothing to look up
+    connection_manager.get_socket("192.168.1.10", 1883, "mqtt:")
+    mock_pool.getaddrinfo.assert_not_called()
+    mock_pool.socket.assert_called_once_with(2, 0)
+    mock_socket_1.connect.assert_called_once_with(("192.168.1.10", 1883))
+
+    # but names that only look like addresses still are
+    connection_manager.get_socket("1.2.3.example", 1883, "mqtt:")
+    mock_pool.getaddrinfo.assert_called_once()
+
+
+def test_get_socket_unix():
+    mock_pool = mocket.MocketPool()
+    mock_pool.AF_UNIX = 1
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    socket = connection_manager.get_socket("/run/mosquitto.sock", 0, "unix:")
+    mock_pool.getaddrinfo.assert_not_called()
+    mock_pool.socket.assert_called_once_with(1, 0)
+    mock_socket_1.connect.assert_called_once_with("/run/mosquitto.sock")
+
+    # pooled like other sockets
+    connection_manager.free_socket(socket)
+    assert connection_manager.get_socket("/run/mosquitto.sock", 0, "unix:") == mock_socket_1
+
+
+def test_get_socket_unix_not_supported():
+    mock_pool = mocket.MocketPool()
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    with pytest.raises(ValueError) as context:
+        connection_manager.get_socket("/run/mosquitto.sock", 0, "unix:")
+    assert "does not support unix sockets" in str(context)
+    assert connection_manager.managed_socket_count == 0
+
+
+@pytest.mark.skipif(not hasattr(socket_module, "AF_UNIX"), reason="needs unix sockets")
+def test_get_socket_unix_cpython(tmp_path):
+    path = str(tmp_path / "sidecar.sock")
+    server = socket_module.socket(socket_module.AF_UNIX, socket_module.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_module)
+    socket = connection_manager.get_socket(path, 0, "unix:")
+    connection, _ = server.accept()
+    socket.send(b"ping")
+    assert connection.recv(4) == b"ping"
+
+    connection.close()
+    connection_manager.close_socket(socket)
+    server.close()
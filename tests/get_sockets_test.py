@@ -0,0 +1,212 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Get Sockets Tests"""
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+from adafruit_connection_manager.simulation import SimulatedSocketPool
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_get_sockets(max_workers):
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_2, "port": 80, "proto": "http:"},
+        ],
+        max_workers=max_workers,
+    )
+    assert set(sockets) == {mock_socket_1, mock_socket_2}
+    assert connection_manager.managed_socket_count == 2
+    assert mock_pool.getaddrinfo.call_count == 2
+
+
+def test_get_sockets_reuses_free_socket():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_2, "port": 80, "proto": "http:"},
+        ]
+    )
+    assert sockets == [mock_socket_1, mock_socket_2]
+    assert connection_manager.available_socket_count == 0
+
+
+def test_get_sockets_errors():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_2.connect.side_effect = OSError("OSError 1")
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_1, "port": 443, "proto": "https:"},
+            {"host": mocket.MOCK_HOST_2, "port": 80, "proto": "http:"},
+        ]
+    )
+    assert sockets[0] == mock_socket_1
+    assert "An existing socket is already connected" in str(sockets[1])
+    assert "ssl_context must be provided if using ssl" in str(sockets[2])
+    assert "OSError 1" in str(sockets[3])
+    assert connection_manager.managed_socket_count == 1
+
+
+def test_get_sockets_max_sockets():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=2)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    # the idle socket is closed to make room, the rest go over the limit
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 443, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_2, "port": 80, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_2, "port": 443, "proto": "http:"},
+        ]
+    )
+    mock_socket_1.close.assert_called_once()
+    assert sockets[:2] == [mock_socket_2, mock_socket_3]
+    assert "Maximum number of sockets reached" in str(sockets[2])
+    assert connection_manager.managed_socket_count == 2
+
+
+def test_get_sockets_out_of_radio_sockets():
+    socket_pool = SimulatedSocketPool(max_sockets=2)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    connection_manager.free_socket(socket_1)
+    connection_manager.free_socket(socket_2)
+
+    # the radio is out of sockets, so like get_socket, the idle ones are closed to retry
+    sockets = connection_manager.get_sockets(
+        [{"host": mocket.MOCK_HOST_1, "port": 443, "proto": "http:"}]
+    )
+    assert not isinstance(sockets[0], Exception)
+    assert connection_manager.managed_socket_count == 1
+    assert socket_pool.stats["out_of_sockets"] == 1
+
+
+def test_get_sockets_auto_session():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    request = {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:", "auto_session": True}
+    sockets = connection_manager.get_sockets([request, request])
+    assert sockets == [mock_socket_1, mock_socket_2]
+
+
+def test_get_sockets_priority():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+
+    # with room for one, the more important request gets it
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_2, "port": 80, "proto": "http:", "priority": 1},
+        ]
+    )
+    assert isinstance(sockets[0], RuntimeError)
+    assert sockets[1] == mock_socket_1
+    assert connection_manager._record_by_managed_socket[mock_socket_1].priority == 1
+
+
+def test_get_sockets_priority_evicts_only_less_important():
+    mock_pool = mocket.MocketPool()
+    mock_pool.socket.side_effect = [mocket.Mocket(), mocket.Mocket(), mocket.Mocket()]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=2)
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", priority=5)
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", priority=5)
+    connection_manager.free_socket(socket_1)
+    connection_manager.free_socket(socket_2)
+
+    # the priority 5 request makes room by closing one idle socket, the priority 0 one can't
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 443, "proto": "http:"},
+            {"host": mocket.MOCK_HOST_2, "port": 443, "proto": "http:", "priority": 5},
+        ]
+    )
+    assert "Maximum number of sockets reached" in str(sockets[0])
+    assert not isinstance(sockets[1], Exception)
+    assert connection_manager.managed_socket_count == 2
+    assert connection_manager.available_socket_count == 1
+    assert socket_1.close.call_count + socket_2.close.call_count == 1
+
+
+def test_get_sockets_unsupported_argument():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # the bad request gets its error and the rest still connect
+    sockets = connection_manager.get_sockets(
+        [
+            {"host": mocket.MOCK_HOST_1, "port": 80, "proto": "http:", "wait_timeout": 1},
+            {"host": mocket.MOCK_HOST_2, "port": 80, "proto": "http:"},
+        ]
+    )
+    assert isinstance(sockets[0], TypeError)
+    assert "wait_timeout" in str(sockets[0])
+    assert sockets[1] == mock_socket_1
+    assert connection_manager.managed_socket_count == 1
@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Hedge Tests"""
+
+import threading
+import time
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+def _slow_socket(release: threading.Event):
+    mock_socket = mocket.Mocket()
+    mock_socket.connect.side_effect = lambda address: release.wait(2)
+    return mock_socket
+
+
+def _get_hedging_connection_manager(mock_pool, **kwargs):
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, **kwargs)
+    connection_manager.configure_hedging(0.9, min_delay=0.01)
+    for _ in range(5):
+        connection_manager._update_connect_time(mocket.MOCK_HOST_1, 80, 0.01)
+    return connection_manager
+
+
+def _wait_for(check):
+    end = time.monotonic() + 2
+    while not check() and time.monotonic() < end:
+        time.sleep(0.01)
+    assert check()
+
+
+def test_hedge_wins():
+    release = threading.Event()
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = _slow_socket(release)
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = _get_hedging_connection_manager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+    assert connection_manager.hedge_stats == {"connects": 1, "hedges": 1, "won": 1}
+
+    # the slow attempt is closed once it connects
+    release.set()
+    _wait_for(lambda: mock_socket_1.close.called)
+    assert connection_manager._reserved_socket_count == 0
+    assert connection_manager.managed_socket_count == 1
+
+
+def test_hedge_first_attempt_wins():
+    release = threading.Event()
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = _slow_socket(release)
+    mock_socket_1.connect.side_effect = lambda address: time.sleep(0.1)
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = _get_hedging_connection_manager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_1
+    assert connection_manager.hedge_stats == {"connects": 1, "hedges": 1, "won": 0}
+
+    release.set()
+    _wait_for(lambda: mock_socket_2.close.called)
+    assert connection_manager._reserved_socket_count == 0
+
+
+def _time_out(address):
+    time.sleep(0.1)
+    raise OSError(110, "Connection timed out")
+
+
+def test_hedge_all_attempts_fail():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_1.connect.side_effect = _time_out
+    mock_socket_2.connect.side_effect = OSError(104, "Connection reset by peer")
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = _get_hedging_connection_manager(mock_pool)
+    with pytest.raises(OSError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    # the last attempt to fail is raised
+    assert "Connection timed out" in str(context)
+    assert connection_manager._reserved_socket_count == 0
+    assert connection_manager.managed_socket_count == 0
+
+
+def test_hedge_budget():
+    release = threading.Event()
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = _slow_socket(release)
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_socket_3.connect.side_effect = lambda address: time.sleep(0.1)
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = _get_hedging_connection_manager(mock_pool)
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    release.set()
+
+    # the hedge used up the budget, so the next slow connect isn't hedged
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", "second")
+    assert socket == mock_socket_3
+    assert connection_manager.hedge_stats == {"connects": 2, "hedges": 1, "won": 1}
+
+
+def test_hedge_no_room():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_1.connect.side_effect = lambda address: time.sleep(0.1)
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = _get_hedging_connection_manager(mock_pool, max_sockets=1)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_1
+    assert mock_pool.socket.call_count == 1
+    assert connection_manager.hedge_stats["hedges"] == 0
+
+
+def test_hedge_needs_samples():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_1.connect.side_effect = lambda address: time.sleep(0.1)
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_hedging(min_delay=0.01)
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert mock_pool.socket.call_count == 1
+    assert connection_manager._hedging.samples_by_origin[(mocket.MOCK_HOST_1, 80)][0] >= 0.1
+
+    # turned off, samples aren't kept
+    connection_manager.configure_hedging(None)
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", "second")
+    assert len(connection_manager._hedging.samples_by_origin[(mocket.MOCK_HOST_1, 80)]) == 1
+    assert connection_manager.hedge_stats["connects"] == 1
+
+
+def test_configure_hedging_bad_percentile():
+    connection_manager = adafruit_connection_manager.ConnectionManager(mocket.MocketPool())
+    with pytest.raises(ValueError) as context:
+        connection_manager.configure_hedging(90)
+    assert "percentile must be between 0 and 1" in str(context)
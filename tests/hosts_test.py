@@ -0,0 +1,114 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Hosts Tests"""
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+PINNED_IP = "10.0.0.5"
+
+
+class InetPool(mocket.MocketPool):
+    AF_INET = 2
+
+
+def test_hosts():
+    mock_pool = InetPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, hosts={mocket.MOCK_HOST_1.upper(): [PINNED_IP, "10.0.0.6"]}
+    )
+
+    # pinned hosts aren't looked up
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    mock_pool.getaddrinfo.assert_not_called()
+    mock_socket_1.connect.assert_called_once_with((PINNED_IP, 80))
+
+    # other hosts are
+    connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    mock_pool.getaddrinfo.assert_called_once()
+
+
+def test_hosts_no_af_inet():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.add_hosts({mocket.MOCK_HOST_1: PINNED_IP})
+
+    # without the constants, the pool is given the address to "look up"
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    mock_pool.getaddrinfo.assert_called_once_with(PINNED_IP, 80, 0, 0)
+
+
+def test_hosts_ssl():
+    mock_pool = InetPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    mock_ssl_context = mocket.SSLContext()
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, hosts={mocket.MOCK_HOST_1: PINNED_IP}
+    )
+
+    # connected by address, but the name is still used for SSL
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 443, "https:", ssl_context=mock_ssl_context)
+    mock_socket_1.connect.assert_called_once_with((PINNED_IP, 443))
+    mock_ssl_context.wrap_socket.assert_called_once_with(
+        mock_socket_1, server_hostname=mocket.MOCK_HOST_1
+    )
+
+
+def test_hosts_fake_ssl(
+    adafruit_esp32spi_socketpool_module,
+):
+    mock_pool = InetPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    radio = mocket.MockRadio.ESP_SPIcontrol()
+    ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, hosts={mocket.MOCK_HOST_1: PINNED_IP}
+    )
+
+    # the co-processor needs the name to connect with TLS
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 443, "https:", ssl_context=ssl_context)
+    mock_socket_1.connect.assert_called_once_with((mocket.MOCK_HOST_1, 443), radio.TLS_MODE)
+
+
+def test_load_hosts(tmp_path):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "# pinned backends\n"
+        f"{PINNED_IP} {mocket.MOCK_HOST_1} api  # the api\n"
+        "\n"
+        f"10.0.0.6 {mocket.MOCK_HOST_1}\n"
+    )
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mocket.MocketPool())
+    connection_manager.load_hosts(str(hosts_path))
+    assert connection_manager._hosts == {
+        mocket.MOCK_HOST_1: [PINNED_IP, "10.0.0.6"],
+        "api": [PINNED_IP],
+    }
+
+
+def test_hosts_no_addresses():
+    connection_manager = adafruit_connection_manager.ConnectionManager(mocket.MocketPool())
+    with pytest.raises(ValueError) as context:
+        connection_manager.add_hosts({"api": PINNED_IP, mocket.MOCK_HOST_1: []})
+    assert f"No addresses for host: {mocket.MOCK_HOST_1}" in str(context)
+    # nothing was pinned
+    assert connection_manager._hosts == {}
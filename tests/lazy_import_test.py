@@ -0,0 +1,39 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Lazy Import Tests"""
+
+import subprocess
+import sys
+
+import mocket
+
+import adafruit_connection_manager
+
+
+def test_import_loads_only_core():
+    # run in a new interpreter, since other tests load the rest of the library
+    modules = subprocess.check_output(
+        [
+            sys.executable,
+            "-c",
+            "import sys, adafruit_connection_manager; "
+            "print(sorted(m for m in sys.modules if m.startswith('adafruit_connection_manager')))",
+        ],
+        text=True,
+    )
+    assert modules.strip() == "['adafruit_connection_manager']"
+
+
+def test_lazy_attributes(
+    adafruit_esp32spi_socketpool_module,
+):
+    from adafruit_connection_manager.fake_ssl import _FakeSSLContext
+    from adafruit_connection_manager.multi import MultiConnectionManager
+
+    assert adafruit_connection_manager.MultiConnectionManager is MultiConnectionManager
+    radio = mocket.MockRadio.ESP_SPIcontrol()
+    ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
+    assert isinstance(ssl_context, _FakeSSLContext)
+    assert adafruit_connection_manager._FakeSSLContext is _FakeSSLContext
@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Maintain Tests"""
+
+import time
+from unittest import mock
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+from adafruit_connection_manager.simulation import SimulatedSocketPool
+
+
+def test_maintain_idle_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, idle_timeout=30)
+    connection_manager.configure_origin(mocket.MOCK_HOST_2, 80, idle_timeout=120)
+
+    with mock.patch("time.monotonic", return_value=100):
+        socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+        socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 443, "http:")
+        connection_manager.free_socket(socket_1)
+        connection_manager.free_socket(socket_2)
+
+    with mock.patch("time.monotonic", return_value=130):
+        assert connection_manager.maintain() == {"closed": 1, "opened": 0}
+    mock_socket_1.close.assert_called_once()
+    mock_socket_2.close.assert_not_called()
+    # sockets in use are never closed
+    mock_socket_3.close.assert_not_called()
+
+    with mock.patch("time.monotonic", return_value=220):
+        assert connection_manager.maintain() == {"closed": 1, "opened": 0}
+    mock_socket_2.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 1
+
+
+def test_maintain_no_idle_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    assert connection_manager.maintain() == {"closed": 0, "opened": 0}
+    assert connection_manager.available_socket_count == 1
+
+
+def test_maintain_min_idle():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, min_idle=2)
+
+    # nothing is known about connecting to the origin yet
+    assert connection_manager.maintain() == {"closed": 0, "opened": 0}
+
+    socket = connection_manager.get_socket(
+        mocket.MOCK_HOST_1, 80, "http:", auto_session=True, read_timeout=5
+    )
+    # with the socket in use, one more is all max_sockets_per_origin allows
+    assert connection_manager.maintain() == {"closed": 0, "opened": 1}
+    mock_socket_2.settimeout.assert_called_with(5)
+    assert connection_manager.available_socket_count == 1
+    assert connection_manager.managed_socket_count == 2
+
+    connection_manager.free_socket(socket)
+    assert connection_manager.maintain() == {"closed": 0, "opened": 0}
+    assert connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True) in {
+        mock_socket_1,
+        mock_socket_2,
+    }
+
+
+def test_reaper():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, idle_timeout=0)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    connection_manager.start_reaper(interval=0.01)
+    for _ in range(500):
+        if not connection_manager.managed_socket_count:
+            break
+        time.sleep(0.01)
+    connection_manager.stop_reaper()
+    assert connection_manager.managed_socket_count == 0
+    mock_socket_1.close.assert_called_once()
+
+
+def test_reaper_no_threading(monkeypatch):
+    monkeypatch.setattr("adafruit_connection_manager.Thread", None)
+    connection_manager = adafruit_connection_manager.ConnectionManager(mocket.MocketPool())
+
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.start_reaper()
+    assert "call maintain() instead" in str(context)
+
+
+def test_maintain_connect_args_only_for_min_idle():
+    mock_pool = mocket.MocketPool()
+    mock_pool.socket.side_effect = [mocket.Mocket(), mocket.Mocket()]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, min_idle=1)
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+
+    # only the origin kept connected remembers how to connect
+    assert list(connection_manager._connect_args_by_origin) == [(mocket.MOCK_HOST_1, 80)]
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80)
+    assert not connection_manager._connect_args_by_origin
+
+
+def test_maintain_min_idle_does_not_evict():
+    socket_pool = SimulatedSocketPool(max_sockets=2)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    connection_manager.configure_origin(mocket.MOCK_HOST_1, 80, min_idle=2)
+
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    connection_manager.free_socket(socket_1)
+    connection_manager.free_socket(socket_2)
+
+    # the radio is out of sockets, so the refill fails without closing the warm ones
+    assert connection_manager.maintain() == {"closed": 0, "opened": 0}
+    assert socket_pool.stats["out_of_sockets"] == 1
+    assert connection_manager.available_socket_count == 2
+    assert connection_manager._reserved_socket_count == 0
@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Multi Connection Manager Tests"""
+
+import errno
+from unittest import mock
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+def _get_radios(count):
+    radios = [mocket.MockRadio.Radio() for _ in range(count)]
+    sockets = []
+    for radio in radios:
+        mock_sockets = [mocket.Mocket(), mocket.Mocket()]
+        adafruit_connection_manager.get_radio_socketpool(radio).socket.side_effect = mock_sockets
+        sockets.append(mock_sockets)
+    return radios, sockets
+
+
+def test_multi_connection_manager_failover(
+    circuitpython_socketpool_module,
+):
+    radios, sockets = _get_radios(2)
+    sockets[0][0].connect.side_effect = OSError("OSError 1")
+
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(radios)
+
+    # the first radio fails, so the second is used
+    socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == sockets[1][0]
+    assert multi_connection_manager.managed_socket_count == 1
+
+    # the first radio is down now, so it isn't tried again
+    multi_connection_manager.free_socket(socket)
+    socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket == sockets[1][1]
+    assert multi_connection_manager.managed_socket_count == 2
+    assert multi_connection_manager.available_socket_count == 1
+
+    # until it's time to retry
+    multi_connection_manager.close_socket(socket)
+    with mock.patch("time.monotonic", return_value=10**6):
+        socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket == sockets[0][1]
+
+
+def test_multi_connection_manager_least_connections(
+    circuitpython_socketpool_module,
+):
+    radios, sockets = _get_radios(2)
+
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(
+        radios, policy="least_connections"
+    )
+
+    socket_1 = multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    socket_2 = multi_connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket_1 == sockets[0][0]
+    assert socket_2 == sockets[1][0]
+
+
+def test_multi_connection_manager_affinity(
+    circuitpython_socketpool_module,
+):
+    radios, sockets = _get_radios(2)
+
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(
+        radios, policy="affinity"
+    )
+
+    socket_1 = multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    socket_2 = multi_connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket_1 == sockets[0][0]
+    assert socket_2 == sockets[1][0]
+
+    # the host sticks to the radio it used before
+    socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", session_id="2")
+    assert socket == sockets[1][1]
+
+
+def test_multi_connection_manager_all_fail(
+    circuitpython_socketpool_module,
+):
+    radios, sockets = _get_radios(2)
+    sockets[0][0].connect.side_effect = OSError("OSError 1")
+    sockets[1][0].connect.side_effect = OSError("OSError 2")
+
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(radios)
+
+    with pytest.raises(OSError) as context:
+        multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert "OSError 2" in str(context)
+
+
+def test_multi_connection_manager_unsupported_policy():
+    with pytest.raises(ValueError) as context:
+        adafruit_connection_manager.MultiConnectionManager([], policy="random")
+    assert "Unsupported policy: random" in str(context)
+
+
+def test_multi_connection_manager_not_managed(
+    circuitpython_socketpool_module,
+):
+    radios, _ = _get_radios(1)
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(radios)
+
+    with pytest.raises(RuntimeError) as context:
+        multi_connection_manager.free_socket(mocket.Mocket())
+    assert "Socket not managed" in str(context)
+
+
+@pytest.mark.parametrize("policy", ["failover", "least_connections"])
+def test_multi_connection_manager_session_in_use(
+    circuitpython_socketpool_module,
+    policy,
+):
+    radios, sockets = _get_radios(2)
+
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(
+        radios, policy=policy
+    )
+    socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == sockets[0][0]
+
+    # no duplicate is opened on the other radio
+    with pytest.raises(RuntimeError) as context:
+        multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert "An existing socket is already connected" in str(context)
+    assert multi_connection_manager.managed_socket_count == 1
+
+    # and once freed, it's reused from its radio
+    multi_connection_manager.free_socket(socket)
+    assert multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:") == socket
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        MemoryError("Out of sockets"),
+        OSError(errno.ENOMEM, "Out of sockets"),
+        OSError(errno.ETIMEDOUT, "Timed out waiting for a socket"),
+        OSError(errno.ETIMEDOUT, "Deadline exceeded"),
+    ],
+)
+def test_multi_connection_manager_out_of_capacity(
+    circuitpython_socketpool_module,
+    error,
+):
+    radios, sockets = _get_radios(2)
+    sockets[0][0].connect.side_effect = error
+
+    multi_connection_manager = adafruit_connection_manager.MultiConnectionManager(radios)
+
+    # the second radio is used, but the first isn't marked down
+    socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == sockets[1][0]
+    socket = multi_connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket == sockets[0][1]
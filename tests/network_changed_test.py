@@ -0,0 +1,147 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Network Changed Tests"""
+
+from unittest import mock
+
+import mocket
+
+import adafruit_connection_manager
+
+
+def test_network_changed_free_socket():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # get a socket and then mark as free
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_1
+    connection_manager.free_socket(socket)
+    assert connection_manager.available_socket_count == 1
+
+    # the stale socket is replaced instead of reused
+    connection_manager.network_changed()
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 1
+    assert connection_manager.available_socket_count == 0
+
+
+def test_network_changed_in_use_socket():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # a socket in use when the network changes is closed when freed
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.network_changed()
+    connection_manager.free_socket(socket)
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 0
+    assert connection_manager.available_socket_count == 0
+
+
+def test_watch_radio():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+    radio = mocket.MockRadio.Radio()
+    radio.connected = True
+    radio.ipv4_address = "10.0.0.2"
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    connection_manager.watch_radio(radio, interval=0)
+
+    # nothing changed, so the socket is reused
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_1
+    connection_manager.free_socket(socket)
+
+    # a new IP address means a new socket
+    radio.ipv4_address = "10.0.0.3"
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+    mock_socket_1.close.assert_called_once()
+    connection_manager.free_socket(socket)
+
+    # and so does a dropped connection
+    radio.connected = False
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_3
+    mock_socket_2.close.assert_called_once()
+
+
+class _CoProcessorRadio:
+    """A radio whose attributes are read over SPI, like the ESP32SPI."""
+
+    def __init__(self):
+        self.reads = []
+        self.address = "10.0.0.2"
+
+    @property
+    def is_connected(self):
+        self.reads.append("is_connected")
+        return True
+
+    @property
+    def ip_address(self):
+        self.reads.append("ip_address")
+        return self.address
+
+    @property
+    def ipv4_address(self):
+        self.reads.append("ipv4_address")
+        return self.address
+
+
+def test_watch_radio_interval():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+    radio = _CoProcessorRadio()
+
+    with mock.patch("time.monotonic", return_value=0):
+        connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+        connection_manager.watch_radio(radio, interval=5)
+        socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+        connection_manager.free_socket(socket)
+    # only the first connection state and IP address attributes are read
+    assert radio.reads == ["is_connected", "ipv4_address"]
+
+    # not checked again until the interval passes
+    radio.address = "10.0.0.3"
+    with mock.patch("time.monotonic", return_value=4):
+        socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+        assert socket == mock_socket_1
+        connection_manager.free_socket(socket)
+    assert len(radio.reads) == 2
+
+    with mock.patch("time.monotonic", return_value=5):
+        socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert socket == mock_socket_2
+    mock_socket_1.close.assert_called_once()
+    assert len(radio.reads) == 4
@@ -0,0 +1,170 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Proxy Tests"""
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+PROXY = ("proxy.example.com", 3128)
+TUNNEL_RESPONSE = b"HTTP/1.1 200 Connection established\r\n\r\n"
+
+
+def test_get_socket_proxy():
+    mock_pool = mocket.MocketPool()
+    mock_pool.getaddrinfo.return_value = ((None, None, None, None, ("10.0.0.1", 3128)),)
+    mock_socket_1 = mocket.Mocket(TUNNEL_RESPONSE)
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    mock_ssl_context = mocket.SSLContext()
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    socket = connection_manager.get_socket(
+        mocket.MOCK_HOST_1,
+        443,
+        "https:",
+        ssl_context=mock_ssl_context,
+        proxy=PROXY,
+        proxy_headers={"Proxy-Authorization": "Basic dXNlcjpwYXNz"},
+    )
+    assert socket == mock_socket_1
+
+    # connected to the proxy, which was asked for the tunnel
+    mock_pool.getaddrinfo.assert_called_once_with(PROXY[0], PROXY[1], 0, 0)
+    mock_socket_1.connect.assert_called_once_with(("10.0.0.1", 3128))
+    assert mock_socket_1.sent_data == [
+        b"CONNECT wifitest.adafruit.com:443 HTTP/1.1\r\n"
+        b"Host: wifitest.adafruit.com:443\r\n"
+        b"Proxy-Authorization: Basic dXNlcjpwYXNz\r\n"
+        b"\r\n"
+    ]
+    # and SSL is used through the tunnel, for the host
+    mock_ssl_context.wrap_socket.assert_called_once_with(
+        mock_socket_1, server_hostname=mocket.MOCK_HOST_1
+    )
+
+    # tunnels are reused for the same proxy only
+    connection_manager.free_socket(socket)
+    (connection,) = connection_manager.connections()
+    assert connection["proxy"] == PROXY
+    socket = connection_manager.get_socket(
+        mocket.MOCK_HOST_1, 443, "https:", ssl_context=mock_ssl_context
+    )
+    assert socket == mock_socket_2
+    assert connection_manager.managed_socket_count == 2
+
+
+def test_get_socket_proxy_ipv6_2xx():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket(b"HTTP/1.1 204 No Content\r\n\r\n")
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # any 2xx opens the tunnel, and IPv6 addresses are bracketed
+    socket = connection_manager.get_socket("2001:db8::1", 80, "http:", proxy=PROXY)
+    assert socket == mock_socket_1
+    assert mock_socket_1.sent_data == [
+        b"CONNECT [2001:db8::1]:80 HTTP/1.1\r\nHost: [2001:db8::1]:80\r\n\r\n"
+    ]
+
+
+def test_get_socket_proxy_refused():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket(b"HTTP/1.1 407 Proxy Authentication Required\r\n\r\n")
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    with pytest.raises(OSError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", proxy=PROXY)
+    assert "Proxy refused the tunnel: HTTP/1.1 407 Proxy Authentication Required" in str(context)
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.managed_socket_count == 0
+
+
+def test_get_socket_proxy_closed():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket(b"HTTP/1.1 200")
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    with pytest.raises(OSError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", proxy=PROXY)
+    assert "Proxy closed the connection" in str(context)
+
+
+def test_get_socket_proxy_auto_session():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket(TUNNEL_RESPONSE)
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    socket = connection_manager.get_socket(
+        mocket.MOCK_HOST_1, 80, "http:", auto_session=True, proxy=PROXY
+    )
+    connection_manager.free_socket(socket)
+    assert connection_manager._record_by_managed_socket[socket].key == (
+        mocket.MOCK_HOST_1,
+        80,
+        "http:",
+        0,
+        PROXY,
+    )
+
+    # a direct connection doesn't reuse the tunnel
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:", auto_session=True)
+    assert socket == mock_socket_2
+
+
+def test_get_socket_proxy_udp():
+    connection_manager = adafruit_connection_manager.ConnectionManager(mocket.MocketPool())
+
+    with pytest.raises(ValueError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 123, "udp:", proxy=PROXY)
+    assert "Proxies can't be used for udp: sockets" in str(context)
+
+
+def test_get_socket_proxy_fake_ssl(
+    adafruit_esp32spi_socketpool_module,
+):
+    mock_pool = mocket.MocketPool()
+    radio = mocket.MockRadio.ESP_SPIcontrol()
+    ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    # the co-processor would do TLS with the proxy, leaving the tunnel in plaintext
+    with pytest.raises(ValueError) as context:
+        connection_manager.get_socket(
+            mocket.MOCK_HOST_1, 443, "https:", ssl_context=ssl_context, proxy=PROXY
+        )
+    assert "The fake SSL context can't be used through a proxy" in str(context)
+    mock_pool.socket.assert_not_called()
+    assert connection_manager._reserved_socket_count == 0
+
+
+def test_get_socket_proxy_server_speaks_first():
+    mock_pool = mocket.MocketPool()
+    banner = b"220 smtp.example.com ESMTP\r\n"
+    # the proxy's response and the server's banner arrive together
+    mock_socket_1 = mocket.Mocket(b"HTTP/1.1 200 OK\r\nVia: proxy\r\n\r\n" + banner)
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 25, "smtp:", proxy=PROXY)
+
+    # none of the banner was read with the proxy's response
+    assert socket.recv(len(banner)) == banner
@@ -0,0 +1,113 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Replay Tests"""
+
+from unittest import mock
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+from adafruit_connection_manager.replay import (
+    RecordingConnectionManager,
+    ReplaySocketPool,
+    load_recording,
+    replay,
+)
+from adafruit_connection_manager.simulation import SimulatedSocketPool, SimulatedSSLContext
+
+
+def _record(path):
+    socket_pool = SimulatedSocketPool(latency={"connect": 0.01}, response=mocket.MOCK_RESPONSE)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    ssl_context = SimulatedSSLContext(socket_pool)
+
+    with RecordingConnectionManager(connection_manager, str(path)) as recorder:
+        socket = recorder.get_socket(
+            mocket.MOCK_HOST_1, 443, "https:", ssl_context=ssl_context, priority=1
+        )
+        socket.send(b"GET / HTTP/1.1\r\n\r\n")
+        buffer = bytearray(len(mocket.MOCK_RESPONSE))
+        socket.recv_into(buffer)
+        recorder.free_socket(socket)
+
+        socket = recorder.get_socket(mocket.MOCK_HOST_1, 443, "https:", ssl_context=ssl_context)
+        socket.send(b"GET / HTTP/1.1\r\n\r\n")
+        socket.recv(4)
+        recorder.close_socket(socket)
+    return socket_pool
+
+
+def test_record(tmp_path):
+    path = tmp_path / "recording.jsonl"
+    _record(path)
+
+    events = load_recording(str(path))
+    assert [event[1:3] for event in events] == [
+        ["get", 1],
+        ["send", 1],
+        ["recv", 1],
+        ["free", 1],
+        ["get", 2],
+        ["send", 2],
+        ["recv", 2],
+        ["close", 2],
+    ]
+    # the SSL context isn't recorded
+    assert events[0][3:8] == [mocket.MOCK_HOST_1, 443, "https:", None, {"priority": 1}]
+    assert events[0][8] >= 10
+    # reused, so there was no connect
+    assert events[4][8] is None
+    assert events[1][3] == "R0VUIC8gSFRUUC8xLjENCg0K"
+    assert events[6][3] == "SFRUUA=="
+
+
+def test_replay(tmp_path):
+    path = tmp_path / "recording.jsonl"
+    recorded_pool = _record(path)
+    events = load_recording(str(path))
+
+    socket_pool = ReplaySocketPool(events, time_scale=0)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    result = replay(connection_manager, events, speed=None)
+    assert result["gets"] == 2
+    assert result["errors"] == 0
+    assert socket_pool.stats["connects"] == recorded_pool.stats["connects"] == 1
+    assert socket_pool.stats["bytes_sent"] == recorded_pool.stats["bytes_sent"]
+    assert socket_pool.stats["bytes_received"] == recorded_pool.stats["bytes_received"]
+    # connects take the recorded time
+    assert socket_pool.stats["elapsed"] == events[0][8] / 1000
+    assert connection_manager.managed_socket_count == 0
+
+
+def test_replay_speed():
+    events = [
+        [0, "get", 1, mocket.MOCK_HOST_1, 80, "http:", None, {}, 5],
+        [1000, "free", 1],
+    ]
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        ReplaySocketPool(events, time_scale=0)
+    )
+    with mock.patch("time.monotonic", return_value=10), mock.patch("time.sleep") as sleep:
+        replay(connection_manager, events, speed=10)
+    sleep.assert_called_once()
+    assert sleep.call_args[0][0] == pytest.approx(0.1)
+
+
+def test_replay_errors():
+    events = [
+        [0, "get", 1, mocket.MOCK_HOST_1, 80, "http:", None, {}, 5],
+        [1, "send", 1, "R0VU"],
+        [2, "free", 1],
+        [3, "get", 2, mocket.MOCK_HOST_2, 80, "http:", None, {}, 5],
+        [4, "free", 2],
+    ]
+    socket_pool = ReplaySocketPool(events, time_scale=0, reset_rate=1)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    result = replay(connection_manager, events, speed=None)
+    # the failed gets' other events are skipped
+    assert result["gets"] == 2
+    assert result["errors"] == 2
+    assert socket_pool.stats["resets"] == 2
@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Simulation Tests"""
+
+import errno
+from unittest import mock
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+from adafruit_connection_manager.simulation import SimulatedSocketPool, SimulatedSSLContext
+
+LATENCY = {
+    "dns": ("uniform", 0.01, 0.05),
+    "connect": ("lognormal", -3, 0.5),
+    "tls": ("normal", 0.2, 0.05),
+    "send": 0.001,
+    "recv": ("exponential", 0.01),
+}
+
+
+def _run(socket_pool):
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    ssl_context = SimulatedSSLContext(socket_pool)
+    for session_id in range(3):
+        socket = connection_manager.get_socket(
+            mocket.MOCK_HOST_1, 443, "https:", session_id, ssl_context=ssl_context
+        )
+        socket.send(b"GET / HTTP/1.1\r\n\r\n")
+        socket.recv(1024)
+    return socket_pool.stats
+
+
+def test_seeded():
+    stats_1 = _run(SimulatedSocketPool(seed=1, latency=LATENCY, time_scale=0))
+    stats_2 = _run(SimulatedSocketPool(seed=1, latency=LATENCY, time_scale=0))
+    stats_3 = _run(SimulatedSocketPool(seed=2, latency=LATENCY, time_scale=0))
+    assert stats_1 == stats_2
+    assert stats_1["elapsed"] != stats_3["elapsed"]
+    assert stats_1["lookups"] == 3
+    assert stats_1["connects"] == 3
+    assert stats_1["bytes_sent"] == 54
+    assert stats_1["bytes_received"] == 114
+
+
+def test_time_scale():
+    socket_pool = SimulatedSocketPool(latency={"connect": 2}, time_scale=0.5)
+    socket = socket_pool.socket()
+    with mock.patch("time.sleep") as sleep:
+        socket.connect(("10.0.0.1", 80))
+    sleep.assert_called_once_with(1.0)
+    assert socket_pool.stats["elapsed"] == 2
+
+
+def test_timeout():
+    socket_pool = SimulatedSocketPool(latency={"connect": 2}, time_scale=0)
+    socket = socket_pool.socket()
+    socket.settimeout(0.5)
+    with pytest.raises(OSError) as context:
+        socket.connect(("10.0.0.1", 80))
+    assert context.value.errno == errno.ETIMEDOUT
+    assert socket_pool.stats["elapsed"] == 0.5
+    assert socket_pool.stats["timeouts"] == 1
+
+    # nothing was sent, so there's nothing to read
+    socket = socket_pool.socket()
+    socket.connect(("10.0.0.1", 80))
+    with pytest.raises(OSError) as context:
+        socket.recv(10)
+    assert context.value.errno == errno.ETIMEDOUT
+
+
+def test_out_of_sockets_evicts():
+    socket_pool = SimulatedSocketPool(max_sockets=1)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+    # the radio is out of sockets, so the idle one is closed to make room
+    connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert socket_pool.stats["out_of_sockets"] == 1
+    assert socket_pool.stats["max_open_sockets"] == 1
+    assert socket_pool.open_socket_count == 1
+
+    with pytest.raises(MemoryError):
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+
+def test_out_of_sockets_os_error():
+    socket_pool = SimulatedSocketPool(max_sockets=1, out_of_sockets_error=OSError)
+    socket_pool.socket()
+    with pytest.raises(OSError) as context:
+        socket_pool.socket()
+    assert context.value.errno == errno.ENOMEM
+
+
+def test_resets():
+    socket_pool = SimulatedSocketPool(seed=1, reset_rate=1)
+    connection_manager = adafruit_connection_manager.ConnectionManager(socket_pool)
+    with pytest.raises(OSError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert context.value.errno == errno.ECONNRESET
+    assert socket_pool.stats["resets"] == 1
+    assert socket_pool.open_socket_count == 0
+
+
+def test_unsupported():
+    with pytest.raises(ValueError) as context:
+        SimulatedSocketPool(latency={"accept": 1})
+    assert "Unsupported operation: accept" in str(context)
+
+    socket_pool = SimulatedSocketPool(latency={"dns": ("pareto", 1)})
+    with pytest.raises(ValueError) as context:
+        socket_pool.getaddrinfo(mocket.MOCK_HOST_1, 80)
+    assert "Unsupported latency distribution: pareto" in str(context)
@@ -0,0 +1,97 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Socket Options Tests"""
+
+from unittest import mock
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+class SocketOptionsPool(mocket.MocketPool):
+    IPPROTO_TCP = 6
+    SOL_SOCKET = 1
+    TCP_NODELAY = 1
+    SO_KEEPALIVE = 9
+    TCP_KEEPIDLE = 4
+    SO_RCVBUF = 8
+
+
+def _get_mock_socket():
+    mock_socket = mocket.Mocket()
+    mock_socket.setsockopt = mock.Mock()
+    return mock_socket
+
+
+def test_socket_options():
+    mock_pool = SocketOptionsPool()
+    mock_socket_1 = _get_mock_socket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool,
+        socket_options={"nodelay": True, "keepalive": True, "keepalive_idle": 30, "sndbuf": 4096},
+    )
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # sndbuf is skipped as the pool has no SO_SNDBUF
+    assert mock_socket_1.setsockopt.call_args_list == [
+        mock.call(6, 1, 1),
+        mock.call(1, 9, 1),
+        mock.call(6, 4, 30),
+    ]
+    mock_socket_1.connect.assert_called_once()
+
+
+def test_socket_options_origin():
+    mock_pool = SocketOptionsPool()
+    mock_socket_1 = _get_mock_socket()
+    mock_socket_2 = _get_mock_socket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, socket_options={"nodelay": True}
+    )
+    connection_manager.configure_origin(
+        mocket.MOCK_HOST_1, 80, socket_options={"nodelay": False, "rcvbuf": 8192}
+    )
+
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    assert mock_socket_1.setsockopt.call_args_list == [mock.call(6, 1, 0), mock.call(1, 8, 8192)]
+
+    connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+    assert mock_socket_2.setsockopt.call_args_list == [mock.call(6, 1, 1)]
+
+
+def test_socket_options_unsupported():
+    mock_pool = SocketOptionsPool()
+    mock_socket_1 = _get_mock_socket()
+    mock_socket_1.setsockopt.side_effect = OSError(95, "Not supported")
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(
+        mock_pool, socket_options={"nodelay": True}
+    )
+
+    # sockets that can't set options still connect
+    assert connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:") == mock_socket_1
+    assert connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:") == mock_socket_2
+
+
+def test_socket_options_unknown():
+    mock_pool = SocketOptionsPool()
+
+    with pytest.raises(ValueError) as context:
+        adafruit_connection_manager.ConnectionManager(mock_pool, socket_options={"nagle": False})
+    assert "Unsupported socket option: nagle" in str(context)
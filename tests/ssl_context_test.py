@@ -76,3 +76,36 @@ def test_connect_wiznet5k_https_supported(
     ):
         ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
     assert isinstance(ssl_context, ssl.SSLContext)
+
+
+def test_fake_ssl_socket_not_reused(
+    adafruit_esp32spi_socketpool_module,
+):
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    radio = mocket.MockRadio.ESP_SPIcontrol()
+    ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    socket_1 = connection_manager.get_socket(
+        mocket.MOCK_HOST_1, 443, "https:", ssl_context=ssl_context
+    )
+    connection_manager.close_socket(socket_1)
+    mock_socket_1.close.assert_called_once()
+
+    socket_2 = connection_manager.get_socket(
+        mocket.MOCK_HOST_2, 443, "https:", ssl_context=ssl_context
+    )
+    assert socket_2 is not socket_1
+
+    # an old reference can't touch the next connection
+    socket_1.close()
+    mock_socket_2.close.assert_not_called()
+    socket_2.send(b"data")
+    assert mock_socket_2.sent_data == [b"data"]
@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Wait Queue Tests"""
+
+import threading
+import time
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+def _get_socket_in_thread(connection_manager, results, *args, **kwargs):
+    def target():
+        try:
+            results.append(connection_manager.get_socket(*args, **kwargs))
+        except Exception as error:
+            results.append(error)
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def _wait_for_waiters(connection_manager, count):
+    for _ in range(500):
+        if connection_manager.waiting_count == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("waiters never queued")
+
+
+def test_free_socket_hands_off_to_waiter():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # a second caller for the same connection waits for it
+    results = []
+    thread = _get_socket_in_thread(
+        connection_manager, results, mocket.MOCK_HOST_1, 80, "http:", wait_timeout=5
+    )
+    _wait_for_waiters(connection_manager, 1)
+
+    # and is handed it as soon as it's freed
+    connection_manager.free_socket(socket)
+    thread.join()
+    assert results == [mock_socket_1]
+    assert connection_manager.available_socket_count == 0
+    assert mock_pool.socket.call_count == 1
+    assert connection_manager.wait_stats["waits"] == 1
+
+
+def test_free_socket_makes_room_in_order():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_3 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+        mock_socket_3,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # two callers for other hosts queue up
+    results_1 = []
+    thread_1 = _get_socket_in_thread(
+        connection_manager, results_1, mocket.MOCK_HOST_2, 80, "http:", wait_timeout=5
+    )
+    _wait_for_waiters(connection_manager, 1)
+    results_2 = []
+    thread_2 = _get_socket_in_thread(
+        connection_manager, results_2, mocket.MOCK_HOST_2, 8080, "http:", wait_timeout=5
+    )
+    _wait_for_waiters(connection_manager, 2)
+
+    # the freed socket is closed to make room for the first one
+    connection_manager.free_socket(socket)
+    thread_1.join()
+    assert results_1 == [mock_socket_2]
+    mock_socket_1.close.assert_called_once()
+    assert connection_manager.waiting_count == 1
+
+    # then the next
+    connection_manager.free_socket(mock_socket_2)
+    thread_2.join()
+    assert results_2 == [mock_socket_3]
+    assert connection_manager.managed_socket_count == 1
+
+
+def test_wait_priority():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # the important caller jumps ahead of the one waiting already
+    results_1 = []
+    thread_1 = _get_socket_in_thread(
+        connection_manager, results_1, mocket.MOCK_HOST_2, 80, "http:", wait_timeout=0.5
+    )
+    _wait_for_waiters(connection_manager, 1)
+    results_2 = []
+    thread_2 = _get_socket_in_thread(
+        connection_manager,
+        results_2,
+        mocket.MOCK_HOST_2,
+        8080,
+        "http:",
+        wait_timeout=5,
+        priority=1,
+    )
+    _wait_for_waiters(connection_manager, 2)
+
+    connection_manager.free_socket(socket)
+    thread_2.join()
+    thread_1.join()
+    assert results_2 == [mock_socket_2]
+    assert isinstance(results_1[0], OSError)
+
+
+def test_wait_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool, max_sockets=1)
+    connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    with pytest.raises(OSError) as context:
+        connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:", wait_timeout=0.05)
+    assert "Timed out waiting for a socket" in str(context)
+    assert connection_manager.waiting_count == 0
+    wait_stats = connection_manager.wait_stats
+    assert wait_stats["waits"] == 1
+    assert wait_stats["timeouts"] == 1
+    assert wait_stats["max_wait_time"] > 0
@@ -0,0 +1,78 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Wait Readable Tests"""
+
+import socket
+from unittest import mock
+
+import mocket
+import pytest
+
+import adafruit_connection_manager
+
+
+def test_wait_readable_select():
+    mock_pool = mocket.MocketPool()
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    socket_1, peer_1 = socket.socketpair()
+    socket_2, peer_2 = socket.socketpair()
+    connection_manager._register_connected_socket((mocket.MOCK_HOST_1, 80, "http:", None), socket_1)
+    connection_manager._register_connected_socket((mocket.MOCK_HOST_2, 80, "http:", None), socket_2)
+
+    try:
+        # nothing to read yet
+        assert connection_manager.wait_readable([socket_1, socket_2], 0) == []
+
+        # only the socket with data is returned
+        peer_2.send(b"data")
+        assert connection_manager.wait_readable([socket_1, socket_2], 1) == [socket_2]
+    finally:
+        for sock in (socket_1, socket_2, peer_1, peer_2):
+            sock.close()
+
+
+def test_wait_readable_available_fallback():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_2 = mocket.Mocket()
+    mock_socket_1._available = mock.Mock(return_value=0)
+    mock_socket_2._available = mock.Mock(side_effect=[0, 0, 5])
+    mock_pool.socket.side_effect = [
+        mock_socket_1,
+        mock_socket_2,
+    ]
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    socket_2 = connection_manager.get_socket(mocket.MOCK_HOST_2, 80, "http:")
+
+    # sockets without a fileno are polled until one reports data
+    with mock.patch("time.sleep") as sleep_mock:
+        assert connection_manager.wait_readable([socket_1, socket_2], 1) == [socket_2]
+    sleep_mock.assert_called_once()
+
+
+def test_wait_readable_available_fallback_timeout():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_socket_1._available = mock.Mock(return_value=0)
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+    socket_1 = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    assert connection_manager.wait_readable([socket_1], 0) == []
+
+
+def test_wait_readable_not_managed():
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+
+    connection_manager = adafruit_connection_manager.ConnectionManager(mock_pool)
+
+    with pytest.raises(RuntimeError) as context:
+        connection_manager.wait_readable([mock_socket_1])
+    assert "Socket not managed" in str(context)
@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2024 Justin Myers for Adafruit Industries
+#
+# SPDX-License-Identifier: Unlicense
+
+"""Weak Registries Tests"""
+
+import gc
+import sys
+from unittest import mock
+
+import mocket
+
+import adafruit_connection_manager
+
+
+def test_weak_registries_connection_manager():
+    assert adafruit_connection_manager.use_weak_registries()
+
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    connection_manager = adafruit_connection_manager.get_connection_manager(mock_pool)
+    assert adafruit_connection_manager.get_connection_manager(mock_pool) is connection_manager
+    socket = connection_manager.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+    connection_manager.free_socket(socket)
+
+    # once unused, the manager is forgotten and its idle sockets closed
+    del connection_manager
+    gc.collect()
+    assert len(adafruit_connection_manager._global_connection_managers) == 0
+    mock_socket_1.close.assert_called_once()
+
+
+def test_weak_registries_socket_in_use():
+    assert adafruit_connection_manager.use_weak_registries()
+
+    mock_pool = mocket.MocketPool()
+    mock_socket_1 = mocket.Mocket()
+    mock_pool.socket.return_value = mock_socket_1
+
+    # nothing else references the manager, but it's kept while the socket is in use
+    socket = adafruit_connection_manager.get_connection_manager(mock_pool).get_socket(
+        mocket.MOCK_HOST_1, 80, "http:"
+    )
+    gc.collect()
+    mock_socket_1.close.assert_not_called()
+    adafruit_connection_manager.get_connection_manager(mock_pool).free_socket(socket)
+
+    # given back, it's forgotten and the idle socket closed
+    gc.collect()
+    assert len(adafruit_connection_manager._global_connection_managers) == 0
+    mock_socket_1.close.assert_called_once()
+
+
+def test_weak_registries_radio(
+    circuitpython_socketpool_module,
+):
+    assert adafruit_connection_manager.use_weak_registries()
+
+    radio = mocket.MockRadio.Radio()
+    socket_pool = adafruit_connection_manager.get_radio_socketpool(radio)
+    ssl_context = adafruit_connection_manager.get_radio_ssl_context(radio)
+    assert adafruit_connection_manager.get_radio_socketpool(radio) is socket_pool
+    assert ssl_context in adafruit_connection_manager._global_ssl_contexts.values()
+
+    # once unused, the socket pool and SSL context are forgotten
+    del radio, socket_pool
+    gc.collect()
+    assert len(adafruit_connection_manager._global_socketpools) == 0
+    assert len(adafruit_connection_manager._global_ssl_contexts) == 0
+    assert len(adafruit_connection_manager._global_key_by_socketpool) == 0
+
+
+def test_weak_registries_lru_fallback(
+    circuitpython_socketpool_module,
+):
+    with mock.patch.dict(sys.modules, {"weakref": None}):
+        assert not adafruit_connection_manager.use_weak_registries(max_socketpools=2)
+
+    radio_1 = mocket.MockRadio.Radio()
+    radio_2 = mocket.MockRadio.Radio()
+    radio_3 = mocket.MockRadio.Radio()
+    socket_pool_1 = adafruit_connection_manager.get_radio_socketpool(radio_1)
+    socket_pool_2 = adafruit_connection_manager.get_radio_socketpool(radio_2)
+    socket_pool_1.socket.return_value = mocket.Mocket()
+    connection_manager_1 = adafruit_connection_manager.get_connection_manager(socket_pool_1)
+    socket = connection_manager_1.get_socket(mocket.MOCK_HOST_1, 80, "http:")
+
+    # using the first pool again makes the second the least recently used
+    assert adafruit_connection_manager.get_radio_socketpool(radio_1) is socket_pool_1
+    socket_pool_3 = adafruit_connection_manager.get_radio_socketpool(radio_3)
+    socket_pools = adafruit_connection_manager._global_socketpools.values()
+    assert socket_pool_1 in socket_pools
+    assert socket_pool_2 not in socket_pools
+    assert socket_pool_3 in socket_pools
+
+    # the next one released has its sockets closed too
+    adafruit_connection_manager.get_radio_socketpool(mocket.MockRadio.Radio())
+    assert socket_pool_1 not in adafruit_connection_manager._global_socketpools.values()
+    assert socket_pool_1 not in adafruit_connection_manager._global_connection_managers
+    socket.close.assert_called_once()